@@ -0,0 +1,217 @@
+import ast
+import math
+from functools import lru_cache
+import numpy as np
+from expressions import compile_expression
+import solvers
+from solvers import PROGRESS_INTERVAL, SolverResult, iteration_count
+
+# Compiled backend for long fixed-step runs of a scalar equation. The user
+# expression is rewritten to use the scalar functions of the math module
+# instead of NumPy ufuncs, and the whole integration loop runs in one call:
+# with Numba installed both are compiled to native code, otherwise they run
+# as plain Python, which is still several times faster than calling NumPy on
+# single floats. Systems, callables and runs that hit math errors (log of a
+# negative number, overflow, ...) use the NumPy engines of solvers.py.
+
+# Below this many steps Numba's compile time costs more than it saves.
+JIT_MIN_STEPS = 50_000
+
+# Rows integrated per compiled call; progress and cancellation are checked in between.
+JIT_CHUNK = 64 * PROGRESS_INTERVAL
+
+
+def _sign(value):
+    return (value > 0) - (value < 0) + 0.0
+
+
+def _cbrt(value):
+    return math.copysign(abs(value) ** (1 / 3), value)
+
+
+# Scalar equivalent of every name an expression may use, directly or after "np.".
+MATH_FUNCTIONS = {
+    "exp": math.exp, "expm1": math.expm1, "log": math.log, "log10": math.log10, "log2": math.log2,
+    "log1p": math.log1p, "sqrt": math.sqrt, "cbrt": _cbrt, "abs": abs, "sign": _sign,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan, "arcsin": math.asin, "arccos": math.acos,
+    "arctan": math.atan, "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "arcsinh": math.asinh, "arccosh": math.acosh, "arctanh": math.atanh, "power": math.pow,
+    "pi": math.pi, "e": math.e,
+}
+
+# Errors raised by scalar math where NumPy would return inf or nan; TypeError
+# comes from a complex result such as (-1) ** 0.5 being stored in a row.
+MATH_ERRORS = (ArithmeticError, ValueError, TypeError)
+
+
+@lru_cache(maxsize=1)
+def _numba():
+    # Numba is optional and slow to import, so it is only loaded on first use.
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba
+
+
+def backend(steps=None):
+    # "numba" when it is installed and the run is long enough to pay for the
+    # compilation, "python" otherwise.
+    if steps is not None and steps < JIT_MIN_STEPS:
+        return "python"
+    return "numba" if _numba() is not None else "python"
+
+
+class _ToMath(ast.NodeTransformer):
+    # Replaces "np.sin" by "sin", which the math namespace resolves.
+    def visit_Attribute(self, node):
+        return ast.copy_location(ast.Name(id=node.attr, ctx=ast.Load()), node)
+
+
+@lru_cache(maxsize=256)
+def scalar_function(text, variables=("x", "y"), use_numba=False):
+    # The expression as a function of plain floats. compile_expression does
+    # the validation, so only whitelisted names can reach this point.
+    compile_expression(text, variables)
+    tree = ast.parse(text.strip(), mode="eval")
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.List, ast.Tuple, ast.Subscript)):
+            raise ValueError("El modo compilado solo admite ecuaciones escalares.")
+        name = node.attr if isinstance(node, ast.Attribute) else getattr(node, "id", None)
+        if name is not None and name not in MATH_FUNCTIONS and name not in variables and name != "np":
+            raise ValueError(f"Sin equivalente escalar: {name}")
+
+    arguments = ast.arguments(
+        posonlyargs=[], args=[ast.arg(arg=name) for name in variables], kwonlyargs=[],
+        kw_defaults=[], defaults=[],
+    )
+    function = ast.Expression(body=ast.Lambda(args=arguments, body=_ToMath().visit(tree.body)))
+    ast.fix_missing_locations(function)
+
+    namespace = {"__builtins__": {}, **MATH_FUNCTIONS}
+    if use_numba:
+        numba = _numba()
+        namespace.update({name: numba.njit(helper) for name, helper in (("sign", _sign), ("cbrt", _cbrt))})
+        return numba.njit(eval(compile(function, "<expresión>", "eval"), namespace))
+    return eval(compile(function, "<expresión>", "eval"), namespace)
+
+
+def supports(function, y0):
+    # Only expression strings of scalar equations can be translated.
+    if not isinstance(function, str) or np.ndim(y0) != 0:
+        return False
+    try:
+        scalar_function(function)
+    except ValueError:
+        return False
+    return True
+
+
+def _rk4_loop(f):
+    # Fills rows start..stop-1 of an RK4 run and returns the y of row "stop".
+    def loop(x0, y, h, start, stop, last, xs, ys):
+        for i in range(start, stop):
+            x = x0 + i * h
+            xs[i] = x
+            ys[i] = y
+            if i == last:
+                break
+            k1 = h * f(x, y)
+            k2 = h * f(x + h / 2, y + k1 / 2)
+            k3 = h * f(x + h / 2, y + k2 / 2)
+            k4 = h * f(x + h, y + k3)
+            y += (k1 + 2 * k2 + 2 * k3 + k4) / 6
+        return y
+
+    return loop
+
+
+def _heun_loop(f):
+    # Fills rows start..stop-1 of an improved Euler run and returns the next y.
+    def loop(x0, y, h, start, stop, xs, ys, y_next, errors):
+        for i in range(start, stop):
+            x = x0 + i * h
+            slope = f(x, y)
+            y_pred = y + h * slope
+            y_corr = y + (h / 2) * (slope + f(x + h, y_pred))
+            xs[i] = x
+            ys[i] = y
+            y_next[i] = y_corr
+            errors[i] = abs(y_corr - y_pred)
+            y = y_corr
+        return y
+
+    return loop
+
+
+@lru_cache(maxsize=64)
+def _kernel(kind, text, use_numba):
+    f = scalar_function(text, ("x", "y"), use_numba)
+    loop = (_rk4_loop if kind == "rk4" else _heun_loop)(f)
+    return _numba().njit(loop) if use_numba else loop
+
+
+def _run(kind, function, x0, y0, h, x_target, progress, use_numba):
+    iterations = iteration_count(x0, h, x_target)
+    loop = _kernel(kind, function, use_numba)
+    chunk = JIT_CHUNK if use_numba else PROGRESS_INTERVAL
+
+    if kind == "rk4":
+        result = SolverResult({"Iteración": np.arange(iterations), "x": np.empty(iterations), "y": np.empty(iterations)})
+        arrays = (result["x"], result["y"])
+    else:
+        result = SolverResult({
+            "Iteración": np.arange(iterations),
+            "x": np.empty(iterations),
+            "y_n": np.empty(iterations),
+            "y_n+1": np.empty(iterations),
+            "Error": np.empty(iterations),
+        })
+        arrays = (result["x"], result["y_n"], result["y_n+1"], result["Error"])
+
+    y = float(y0)
+    for start in range(0, iterations, chunk):
+        if progress is not None:
+            progress(start, iterations, result.head(start))
+        stop = min(start + chunk, iterations)
+        if kind == "rk4":
+            y = loop(float(x0), y, float(h), start, stop, iterations - 1, *arrays)
+        else:
+            y = loop(float(x0), y, float(h), start, stop, *arrays)
+    result.info["backend"] = "numba" if use_numba else "python"
+    # Same checkpoint as the solvers engines, so solvers.continue_solve can resume either.
+    last = iterations - 1 if kind == "rk4" else iterations
+    result.checkpoint = {"method": "rk4" if kind == "rk4" else "improved_euler", "x0": x0, "h": h, "row": last, "y": y}
+    return result
+
+
+def rk4_solve(function, x0, y0, h, x_target, progress=None, backend_name=None, on_step=None):
+    # Same rows as solvers.rk4_solve, computed by the compiled backend when the
+    # equation allows it. backend_name forces "numba", "python" or "numpy".
+    # The compiled loop cannot call back per step, so on_step uses NumPy.
+    return _solve("rk4", solvers.rk4_solve, function, x0, y0, h, x_target, progress, backend_name, on_step)
+
+
+def improved_euler_solve(function, x0, y0, h, x_target, progress=None, backend_name=None, on_step=None):
+    # Same rows as solvers.improved_euler_solve, see rk4_solve.
+    return _solve("heun", solvers.improved_euler_solve, function, x0, y0, h, x_target, progress, backend_name, on_step)
+
+
+BACKENDS = ("numba", "python", "numpy")
+
+
+def _solve(kind, fallback, function, x0, y0, h, x_target, progress, backend_name, on_step=None):
+    if backend_name is not None and backend_name not in BACKENDS:
+        raise ValueError(f"Modo de cálculo desconocido: {backend_name}")
+    if backend_name == "numpy" or on_step is not None or not supports(function, y0):
+        return fallback(function, x0, y0, h, x_target, progress, on_step)
+
+    name = backend_name or backend(iteration_count(x0, h, x_target))
+    if name == "numba" and _numba() is None:
+        raise ValueError("Numba no está instalado.")
+    try:
+        return _run(kind, function, x0, y0, h, x_target, progress, name == "numba")
+    except MATH_ERRORS:
+        pass
+    # The NumPy engine turns most of these into inf/nan rows instead of stopping.
+    return fallback(function, x0, y0, h, x_target, progress)
@@ -0,0 +1,163 @@
+import numpy as np
+from expressions import compile_expression
+
+# Forward-mode automatic differentiation. A Dual carries a value and its
+# derivative with respect to x; every operation a user expression may use
+# (the arithmetic operators and the whitelisted NumPy functions, which are
+# ufuncs) updates both with the chain rule. Evaluating the compiled
+# expression once on Dual(x, 1) gives f(x) and f'(x) together, for a float x
+# or for an array of x values, with no SymPy involved.
+
+_LN10 = np.log(10.0)
+_LN2 = np.log(2.0)
+
+# d/dv of every one-argument ufunc, as a function of v.
+_UNARY = {
+    np.positive: lambda v: np.ones_like(v),
+    np.negative: lambda v: -np.ones_like(v),
+    np.exp: np.exp,
+    np.expm1: np.exp,
+    np.log: lambda v: 1 / v,
+    np.log10: lambda v: 1 / (v * _LN10),
+    np.log2: lambda v: 1 / (v * _LN2),
+    np.log1p: lambda v: 1 / (1 + v),
+    np.sqrt: lambda v: 0.5 / np.sqrt(v),
+    np.cbrt: lambda v: 1 / (3 * np.cbrt(v) ** 2),
+    np.absolute: np.sign,
+    np.sign: np.zeros_like,
+    np.sin: np.cos,
+    np.cos: lambda v: -np.sin(v),
+    np.tan: lambda v: 1 / np.cos(v) ** 2,
+    np.arcsin: lambda v: 1 / np.sqrt(1 - v * v),
+    np.arccos: lambda v: -1 / np.sqrt(1 - v * v),
+    np.arctan: lambda v: 1 / (1 + v * v),
+    np.sinh: np.cosh,
+    np.cosh: np.sinh,
+    np.tanh: lambda v: 1 / np.cosh(v) ** 2,
+    np.arcsinh: lambda v: 1 / np.sqrt(v * v + 1),
+    np.arccosh: lambda v: 1 / np.sqrt(v * v - 1),
+    np.arctanh: lambda v: 1 / (1 - v * v),
+}
+
+
+def _power(a, da, b, db):
+    # d(a**b); a constant exponent avoids log(a), so x**2 works for negative x.
+    value = a ** b
+    if db is None:
+        return value, b * a ** (b - 1) * da
+    log_term = np.log(a) * db
+    return value, value * (log_term if da is None else log_term + b * da / a)
+
+
+# Value and derivative of every two-argument ufunc, given (a, da, b, db);
+# da or db is None when that operand is a constant.
+_BINARY = {
+    np.add: lambda a, da, b, db: (a + b, _sum(da, db)),
+    np.subtract: lambda a, da, b, db: (a - b, _sum(da, None if db is None else -db)),
+    np.multiply: lambda a, da, b, db: (a * b, _sum(None if da is None else da * b, None if db is None else a * db)),
+    np.true_divide: lambda a, da, b, db: (a / b, _sum(None if da is None else da / b,
+                                                       None if db is None else -a * db / (b * b))),
+    np.floor_divide: lambda a, da, b, db: (a // b, np.zeros_like(a // b, dtype=float)),
+    np.remainder: lambda a, da, b, db: (a % b, _sum(da, None if db is None else -(a // b) * db)),
+    np.power: _power,
+}
+
+
+def _sum(da, db):
+    if da is None:
+        return db
+    if db is None:
+        return da
+    return da + db
+
+
+def _split(value):
+    if isinstance(value, Dual):
+        return value.value, value.derivative
+    return value, None
+
+
+class Dual:
+    # value + derivative * eps, with eps ** 2 = 0.
+    __slots__ = ("value", "derivative")
+
+    def __init__(self, value, derivative=0.0):
+        self.value = value
+        self.derivative = derivative
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # np.sin(dual), np.power(dual, 3), ndarray * dual, ... all end up here.
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        if len(inputs) == 1 and ufunc in _UNARY:
+            value, derivative = _split(inputs[0])
+            return Dual(ufunc(value), _UNARY[ufunc](value) * derivative)
+        if len(inputs) == 2 and ufunc in _BINARY:
+            return Dual(*_BINARY[ufunc](*_split(inputs[0]), *_split(inputs[1])))
+        raise ValueError(f"Sin derivada automática para {ufunc.__name__}")
+
+    def __add__(self, other):
+        return np.add(self, other)
+
+    def __radd__(self, other):
+        return np.add(other, self)
+
+    def __sub__(self, other):
+        return np.subtract(self, other)
+
+    def __rsub__(self, other):
+        return np.subtract(other, self)
+
+    def __mul__(self, other):
+        return np.multiply(self, other)
+
+    def __rmul__(self, other):
+        return np.multiply(other, self)
+
+    def __truediv__(self, other):
+        return np.true_divide(self, other)
+
+    def __rtruediv__(self, other):
+        return np.true_divide(other, self)
+
+    def __floordiv__(self, other):
+        return np.floor_divide(self, other)
+
+    def __rfloordiv__(self, other):
+        return np.floor_divide(other, self)
+
+    def __mod__(self, other):
+        return np.remainder(self, other)
+
+    def __rmod__(self, other):
+        return np.remainder(other, self)
+
+    def __pow__(self, other):
+        return np.power(self, other)
+
+    def __rpow__(self, other):
+        return np.power(other, self)
+
+    def __neg__(self):
+        return np.negative(self)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return np.absolute(self)
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.derivative!r})"
+
+
+def value_and_derivative(function, x):
+    # f(x) and f'(x) from a single evaluation. "function" is an expression of
+    # x or a callable built from the same operations; x may be an array.
+    func = compile_expression(function, ("x",)) if isinstance(function, str) else function
+    x = np.asarray(x, dtype=float) if np.ndim(x) else float(x)
+    result = func(Dual(x, np.ones_like(x)))
+    if isinstance(result, Dual):
+        return result.value, result.derivative
+    # The expression does not depend on x.
+    return result, np.zeros_like(result, dtype=float)
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from contextlib import contextmanager, nullcontext
+import accelerated
+from formatting import parse_precision
+from profiling import Profile
+from stiff import IMPLICIT_METHODS
+from result_store import ResultWriter, result_dtype
+from solvers import (
+    SolverResult, improved_euler_adaptive_solve, improved_euler_dense_solve, rk45_solve, rk4_dense_solve, newton_solve,
+    newton_multistart, evaluation_points, initial_state, ode_function,
+)
+
+METHODS = ("improved_euler", "runge_kutta", "newton_raphson")
+
+# Rows solved and written at a time; bounds the memory used by long fixed-step runs.
+CHUNK_SIZE = 10_000
+
+
+def read_jobs(path):
+    # Yields the jobs of a JSON file (one object or a list of them) or of a
+    # JSONL file (one object per line, read lazily). "-" reads JSONL from stdin.
+    if path == "-":
+        yield from _read_lines(sys.stdin)
+        return
+
+    with open(path, encoding="utf-8") as file:
+        if path.endswith(".jsonl"):
+            yield from _read_lines(file)
+        else:
+            data = json.load(file)
+            yield from (data if isinstance(data, list) else [data])
+
+
+def _read_lines(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def job_method(job, default="runge_kutta"):
+    # The GUI export names its method; older exports are recognised by their fields.
+    method = job.get("method") or ("newton_raphson" if "derivative" in job or "y0" not in job else default)
+    if method not in METHODS:
+        raise ValueError(f"Método desconocido: {method}")
+    return method
+
+
+def job_value(job, key, default=None, cast=float):
+    # The GUI exports every input as text, so "" means the field was left empty.
+    value = job.get(key, default)
+    if value is None or value == "":
+        if default is None:
+            raise ValueError(f"Falta el campo '{key}'.")
+        value = default
+    return cast(value)
+
+
+def job_precision(job):
+    # Only a missing or empty field means full precision; 0 rounds to integers.
+    value = job.get("precision")
+    return parse_precision("" if value is None else value)
+
+
+def solve_job(job, default_method="runge_kutta", chunk_size=CHUNK_SIZE, profile=None):
+    # Yields the results of one job as consecutive SolverResult chunks.
+    # Fixed-step runs are integrated chunk by chunk, each chunk starting from
+    # the last state of the previous one, so the full trajectory never has to
+    # be held in memory. With a Profile the evaluations and steps are counted
+    # into it, which also keeps the run on the NumPy engines.
+    method = job_method(job, default_method)
+    function_str = job["function"]
+    on_step = profile.on_step if profile is not None else None
+
+    if method == "newton_raphson":
+        # Without a "derivative" f' comes from automatic differentiation of f.
+        derivative = job.get("derivative") or None
+        precision = job_precision(job)
+        if profile is not None:
+            function_str = profile.counted(function_str, "f", ("x",))
+            if derivative is not None:
+                derivative = profile.counted(derivative, "df", ("x",))
+        if job.get("mode") == "roots":
+            # Every distinct root in [a, b], from "starts" Newton runs spread over the interval at once.
+            roots = newton_multistart(function_str, derivative, job_value(job, "a"), job_value(job, "b"),
+                                      starts=job_value(job, "starts", 200, int),
+                                      max_iterations=job_value(job, "max_iterations", 50, int))
+            yield SolverResult({"Raíz": roots}, {"roots": len(roots)})
+            return
+        yield newton_solve(function_str, derivative, job_value(job, "x0"), precision,
+                           max_iterations=job_value(job, "max_iterations", 100, int), on_step=on_step)
+        return
+
+    x0 = job_value(job, "x0")
+    y0 = job_value(job, "y0", cast=initial_state)
+    # "points" (a list or the GUI's text) asks for dense output at those x values only.
+    points = job.get("points")
+    points = evaluation_points(points) if isinstance(points, str) else points
+    x_target = job_value(job, "target_x") if points is None else None
+    # "higher_order": y0 holds y, y', ... and the function gives the highest derivative.
+    func = ode_function(function_str, y0, job.get("higher_order", False))
+    if profile is not None:
+        func = profile.counted(func)
+
+    if job.get("mode") == "adaptive":
+        if points is not None:
+            raise ValueError("Los puntos de evaluación solo se usan con paso fijo.")
+        if method == "improved_euler":
+            yield improved_euler_adaptive_solve(func, x0, y0, x_target, tol=job_value(job, "tolerance", 1e-4), on_step=on_step)
+        else:
+            yield rk45_solve(func, x0, y0, x_target, rtol=job_value(job, "rtol", 1e-6), atol=job_value(job, "atol", 1e-9),
+                             on_step=on_step)
+        return
+
+    h = job_value(job, "step_size")
+    if h <= 0:
+        raise ValueError("El tamaño de paso debe ser mayor que cero.")
+    # "mode": "backward_euler", "trapezoidal" or "bdf2" solves a stiff equation implicitly.
+    if job.get("mode") in IMPLICIT_METHODS:
+        if points is not None:
+            raise ValueError("Los puntos de evaluación solo se usan con paso fijo.")
+        yield IMPLICIT_METHODS[job["mode"]](func, x0, y0, h, x_target, on_step=on_step)
+        return
+    if points is not None:
+        dense = improved_euler_dense_solve if method == "improved_euler" else rk4_dense_solve
+        yield dense(func, x0, y0, h, points, on_step=on_step)
+        return
+    total = int(round((x_target - x0) / h)) + 1
+    # Chosen for the whole run, since the compiled kernel is shared by every chunk.
+    backend = job.get("backend") or accelerated.backend(total)
+
+    start = 0
+    x, y = x0, y0
+    while start < total:
+        count = min(chunk_size, total - start)
+        more = start + count < total
+        if method == "improved_euler":
+            chunk = accelerated.improved_euler_solve(func, x, y, h, x + (count - 1) * h, backend_name=backend, on_step=on_step)
+            y = chunk["y_n+1"][-1]
+        else:
+            # RK rows hold the state before each step; one extra row gives the start of the next chunk.
+            chunk = accelerated.rk4_solve(func, x, y, h, x + (count if more else count - 1) * h, backend_name=backend,
+                                          on_step=on_step)
+            y = chunk["y"][-1]
+            chunk = chunk.head(count)
+        chunk.columns["Iteración"] = chunk["Iteración"] + start
+        yield chunk
+
+        start += count
+        x = x0 + start * h
+
+
+class JobTimeout(Exception):
+    pass
+
+
+@contextmanager
+def time_limit(seconds):
+    # Interrupts the current job with JobTimeout after "seconds", which also
+    # covers a single expression evaluation that never returns. Relies on
+    # SIGALRM, so it only works on Unix and in the main thread of a process.
+    if not seconds or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def interrupt(signum, frame):
+        raise JobTimeout(f"El trabajo superó el límite de {seconds} s.")
+
+    previous = signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_job(index, job, rows_out, default_method="runge_kutta", summary_only=False, output_dir=None, timeout=None,
+            output_format="jsonl"):
+    # Runs one job, writing its rows as soon as each chunk is solved, and
+    # returns its summary. With output_format="npy" the rows go, at full
+    # precision, to a binary file in output_dir instead of JSON lines. A job
+    # with "profile": true also gets the cost breakdown of profiling.Profile
+    # in its summary, with the time spent writing rows as display time.
+    file = None
+    writer = None
+    try:
+        target = rows_out
+        if output_dir is not None and not summary_only and output_format == "jsonl":
+            file = open(os.path.join(output_dir, f"job_{index}.jsonl"), "w", encoding="utf-8")
+            target = file
+
+        precision = job_precision(job)
+        profile = Profile() if job.get("profile") else None
+        rows = 0
+        last = None
+        info = {}
+        with time_limit(timeout):
+            if profile is not None:
+                profile.start()
+            for chunk in solve_job(job, default_method, profile=profile):
+                with profile.displaying() if profile is not None else nullcontext():
+                    if len(chunk):
+                        last = chunk.tail(1).records(precision)[0]
+                    rows += len(chunk)
+                    info = chunk.info
+                    if output_format == "npy" and output_dir is not None and not summary_only:
+                        if writer is None:
+                            writer = ResultWriter(os.path.join(output_dir, f"job_{index}.npy"), result_dtype(chunk))
+                        writer.append(chunk)
+                    elif not summary_only:
+                        for record in chunk.records(precision):
+                            target.write(json.dumps({"job": index, **record}, ensure_ascii=False) + "\n")
+            if profile is not None:
+                profile.stop()
+        summary = {"job": index, "status": "ok", "rows": rows, "last": last, "info": info}
+        if profile is not None:
+            summary["profile"] = profile.as_dict()
+        return summary
+    except JobTimeout as e:
+        return {"job": index, "status": "timeout", "error": str(e)}
+    except Exception as e:
+        return {"job": index, "status": "error", "error": str(e)}
+    finally:
+        if file is not None:
+            file.close()
+        if writer is not None:
+            writer.close()
+
+
+def run_jobs(jobs, rows_out, summary_out, default_method="runge_kutta", summary_only=False, output_dir=None, timeout=None,
+             output_format="jsonl"):
+    # Runs every job in order, one summary line per job after its rows.
+    for index, job in enumerate(jobs):
+        summary = run_job(index, job, rows_out, default_method, summary_only, output_dir, timeout, output_format)
+        summary_out.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        summary_out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta trabajos de la calculadora desde un archivo JSON o JSONL.")
+    parser.add_argument("jobs", help="archivo de trabajos (.json o .jsonl); '-' lee JSONL de la entrada estándar")
+    parser.add_argument("--method", choices=METHODS, default="runge_kutta",
+                        help="método para los trabajos que no lo indican")
+    parser.add_argument("--summary", action="store_true", help="solo una línea de resumen por trabajo")
+    parser.add_argument("--output-dir", metavar="DIR", help="escribe las filas de cada trabajo en DIR/job_N.jsonl")
+    parser.add_argument("--format", choices=("jsonl", "npy"), default="jsonl",
+                        help="formato de los archivos de --output-dir; npy guarda las filas en binario sin redondear")
+    parser.add_argument("--timeout", type=float, help="segundos máximos por trabajo")
+    parser.add_argument("--profile", action="store_true",
+                        help="añade al resumen evaluaciones, pasos y tiempos de cada trabajo (sin modo compilado)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos en paralelo; 0 usa todos los núcleos (por defecto 1, sin paralelismo)")
+    parser.add_argument("--chunksize", type=int, default=8, help="trabajos enviados juntos a cada proceso")
+    parser.add_argument("--unordered", action="store_true", help="escribe cada trabajo en cuanto termina, sin respetar el orden")
+    args = parser.parse_args(argv)
+
+    if args.format == "npy" and not args.output_dir:
+        parser.error("--format npy requiere --output-dir")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs = read_jobs(args.jobs)
+    if args.profile:
+        jobs = ({**job, "profile": True} for job in jobs)
+    if args.workers == 1:
+        run_jobs(jobs, sys.stdout, sys.stdout, args.method, args.summary, args.output_dir, args.timeout, args.format)
+    else:
+        from parallel import run_jobs_parallel
+
+        run_jobs_parallel(
+            jobs, sys.stdout, sys.stdout, workers=args.workers or None, chunksize=args.chunksize,
+            ordered=not args.unordered, timeout=args.timeout, default_method=args.method,
+            summary_only=args.summary, output_dir=args.output_dir, output_format=args.format,
+        )
+
+
+if __name__ == "__main__":
+    main()
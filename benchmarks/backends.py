@@ -0,0 +1,72 @@
+import argparse
+import json
+import sys
+import time
+import accelerated
+
+# Long fixed-step runs of scalar equations: (name, f(x, y), x0, y0, h, xf).
+PROBLEMS = [
+    ("exponencial", "y", 0.0, 1.0, 1e-5, 2.0),
+    ("oscilante", "np.cos(x) * y", 0.0, 1.0, 1e-5, 10.0),
+    ("mixta", "np.sin(x) * np.exp(-x) + np.sqrt(abs(y)) - np.arctan(y)", 0.0, 1.0, 1e-5, 10.0),
+]
+
+SOLVERS = {"rk4": accelerated.rk4_solve, "euler_mejorado": accelerated.improved_euler_solve}
+
+
+def benchmark_backends(problems=PROBLEMS, backends=("numpy", "python", "numba"), repeat=3):
+    # Best wall time of every solver and backend. The first Numba run of an
+    # expression includes its compilation and is reported separately.
+    if accelerated.backend() != "numba":
+        backends = [name for name in backends if name != "numba"]
+
+    records = []
+    for name, function, x0, y0, h, xf in problems:
+        for method, solve in SOLVERS.items():
+            baseline = None
+            for backend in backends:
+                start = time.perf_counter()
+                solve(function, x0, y0, h, xf, backend_name=backend)
+                first = time.perf_counter() - start
+
+                best = first
+                for _ in range(repeat - 1):
+                    start = time.perf_counter()
+                    solve(function, x0, y0, h, xf, backend_name=backend)
+                    best = min(best, time.perf_counter() - start)
+
+                if backend == "numpy":
+                    baseline = best
+                records.append({
+                    "problem": name,
+                    "method": method,
+                    "backend": backend,
+                    "steps": int(round((xf - x0) / h)),
+                    "first_run_seconds": first,
+                    "seconds": best,
+                    "speedup": baseline / best if baseline else None,
+                })
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara los modos de cálculo de los métodos de paso fijo.")
+    parser.add_argument("--repeat", type=int, default=3, help="ejecuciones por caso; se toma la más rápida")
+    parser.add_argument("--json", action="store_true", help="imprime el resultado completo en JSON")
+    args = parser.parse_args(argv)
+
+    records = benchmark_backends(repeat=args.repeat)
+    if args.json:
+        json.dump(records, sys.stdout, indent=4)
+        print()
+        return
+
+    print(f"{'problema':<14}{'método':<16}{'modo':<8}{'pasos':>9}{'1ª vez (ms)':>13}{'tiempo (ms)':>13}{'aceleración':>13}")
+    for record in records:
+        speedup = "-" if record["speedup"] is None else f"{record['speedup']:.1f}x"
+        print(f"{record['problem']:<14}{record['method']:<16}{record['backend']:<8}{record['steps']:>9}"
+              f"{record['first_run_seconds'] * 1000:>13.1f}{record['seconds'] * 1000:>13.1f}{speedup:>13}")
+
+
+if __name__ == "__main__":
+    main()
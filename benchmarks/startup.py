@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What is imported before the menu window can appear, and what each method adds on top.
+TARGETS = {
+    "menu": "import menu",
+    "improved_euler": "import menu, improved_euler",
+    "runge_kutta": "import menu, runge_kutta",
+    "newton_raphson": "import menu, newton_raphson",
+    "newton_raphson+sympy": "import menu, newton_raphson, sympy",
+}
+
+
+def measure_import(statement, repeat=3):
+    # Runs the statement in fresh interpreters with -X importtime and returns
+    # the best wall time plus the per-module cumulative times of that run.
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        wall = time.perf_counter() - start
+        if best is None or wall < best[0]:
+            best = (wall, completed.stderr)
+
+    wall, stderr = best
+    return {"wall_seconds": wall, "modules": _parse_importtime(stderr)}
+
+
+def _parse_importtime(stderr):
+    # Lines look like "import time:   self [us] | cumulative | imported package".
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "top_level": not name.startswith("  "),
+        })
+    return modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo de importación al iniciar la calculadora.")
+    parser.add_argument("--top", type=int, default=10, help="módulos de primer nivel a mostrar por objetivo")
+    parser.add_argument("--repeat", type=int, default=3, help="ejecuciones por objetivo; se toma la más rápida")
+    parser.add_argument("--json", action="store_true", help="imprime el resultado completo en JSON")
+    args = parser.parse_args(argv)
+
+    report = {name: measure_import(statement, args.repeat) for name, statement in TARGETS.items()}
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+        return
+
+    for name, measurement in report.items():
+        print(f"{name}: {measurement['wall_seconds'] * 1000:.1f} ms")
+        top_level = [module for module in measurement["modules"] if module["top_level"]]
+        for module in sorted(top_level, key=lambda module: module["cumulative_ms"], reverse=True)[:args.top]:
+            print(f"    {module['cumulative_ms']:9.1f} ms  {module['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+import time
+from solvers import rk4_solve, rk45_solve
+from stiff import IMPLICIT_METHODS
+
+# Stiff problems: (name, f(x, y), x0, y0, xf, h of the implicit methods, largest stable h of RK4).
+PROBLEMS = [
+    ("lineal", "-1000 * (y - np.cos(x))", 0.0, 0.0, 10.0, 0.1, 0.002),
+    ("robertson", "[-0.04*y[0] + 1e4*y[1]*y[2], 0.04*y[0] - 1e4*y[1]*y[2] - 3e7*y[1]**2, 3e7*y[1]**2]",
+     0.0, "1, 0, 0", 40.0, 0.1, 0.0003),
+]
+
+
+def benchmark_stiff(problems=PROBLEMS, repeat=3):
+    # Best wall time of the explicit engines, at a step small enough to be
+    # stable, against the implicit ones with a large step. The final y of each
+    # run is included to compare the answers.
+    records = []
+    for name, function, x0, y0, xf, h, h_explicit in problems:
+        runs = {"rk4": lambda: rk4_solve(function, x0, y0, h_explicit, xf),
+                "rk45": lambda: rk45_solve(function, x0, y0, xf, max_steps=10**7)}
+        runs.update({method: (lambda solve=solve: solve(function, x0, y0, h, xf)) for method, solve in IMPLICIT_METHODS.items()})
+
+        for method, run in runs.items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = run()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            last = result["y"][-1]
+            records.append({
+                "problem": name,
+                "method": method,
+                "steps": len(result) - 1,
+                "seconds": best,
+                "y_final": last.tolist() if hasattr(last, "tolist") else last,
+            })
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara los métodos explícitos e implícitos en ecuaciones rígidas.")
+    parser.add_argument("--repeat", type=int, default=3, help="ejecuciones por caso; se toma la más rápida")
+    parser.add_argument("--json", action="store_true", help="imprime el resultado completo en JSON")
+    args = parser.parse_args(argv)
+
+    records = benchmark_stiff(repeat=args.repeat)
+    if args.json:
+        json.dump(records, sys.stdout, indent=4)
+        print()
+        return
+
+    print(f"{'problema':<12}{'método':<16}{'pasos':>9}{'tiempo (ms)':>13}  y final")
+    for record in records:
+        print(f"{record['problem']:<12}{record['method']:<16}{record['steps']:>9}{record['seconds'] * 1000:>13.1f}  {record['y_final']}")
+
+
+if __name__ == "__main__":
+    main()
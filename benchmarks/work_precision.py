@@ -0,0 +1,175 @@
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+import numpy as np
+from expressions import compile_expression
+from solvers import improved_euler_solve, improved_euler_adaptive_solve, rk4_solve, rk45_solve, newton_solve
+
+# ODE problems with known solutions: (name, f(x, y), x0, y0, xf, exact y(x)).
+ODE_PROBLEMS = [
+    ("exponencial", "y", 0.0, 1.0, 2.0, lambda x: math.exp(x)),
+    ("polinomial", "y - x**2 + 1", 0.0, 0.5, 2.0, lambda x: (x + 1) ** 2 - 0.5 * math.exp(x)),
+    ("oscilante", "np.cos(x) * y", 0.0, 1.0, 10.0, lambda x: math.exp(math.sin(x))),
+    ("logistica", "y * (1 - y)", 0.0, 0.1, 10.0, lambda x: 1 / (1 + 9 * math.exp(-x))),
+]
+
+# Root problems: (name, f(x), f'(x), x0, root).
+ROOT_PROBLEMS = [
+    ("raiz_de_2", "x**2 - 2", "2*x", 1.0, math.sqrt(2)),
+    ("coseno", "np.cos(x) - x", "-np.sin(x) - 1", 1.0, 0.7390851332151607),
+    ("cubica", "x**3 - 2*x - 5", "3*x**2 - 2", 2.0, 2.0945514815423265),
+    ("exp_igual_2", "np.exp(x) - 2", "np.exp(x)", 0.0, math.log(2)),
+]
+
+STEP_SIZES = (0.1, 0.05, 0.02, 0.01, 0.005, 0.001)
+TOLERANCES = (1e-3, 1e-5, 1e-7, 1e-9)
+
+
+class CountingFunction:
+    # Wraps a compiled expression and counts how many times a solver calls it.
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.func(*args)
+
+
+def _run(solve, function, variables, repeat):
+    # Best wall time over "repeat" runs, then one extra run under tracemalloc
+    # for peak memory so the tracing overhead does not distort the timing.
+    best = math.inf
+    for _ in range(repeat):
+        counter = CountingFunction(compile_expression(function, variables))
+        start = time.perf_counter()
+        result = solve(counter)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    solve(CountingFunction(compile_expression(function, variables)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, counter.calls, best, peak
+
+
+def benchmark_odes(step_sizes=STEP_SIZES, tolerances=TOLERANCES, repeat=3):
+    records = []
+    for name, function, x0, y0, xf, exact in ODE_PROBLEMS:
+        runs = []
+        for h in step_sizes:
+            runs.append(("euler_mejorado", {"h": h}, lambda f, h=h: improved_euler_solve(f, x0, y0, h, xf), "y_n"))
+            runs.append(("rk4", {"h": h}, lambda f, h=h: rk4_solve(f, x0, y0, h, xf), "y"))
+        for tol in tolerances:
+            runs.append(("euler_adaptativo", {"tol": tol}, lambda f, tol=tol: improved_euler_adaptive_solve(f, x0, y0, xf, tol=tol), "y_n+1"))
+            runs.append(("rk45", {"rtol": tol, "atol": tol * 1e-3}, lambda f, tol=tol: rk45_solve(f, x0, y0, xf, rtol=tol, atol=tol * 1e-3), "y"))
+
+        for method, parameters, solve, column in runs:
+            result, evaluations, seconds, peak = _run(solve, function, ("x", "y"), repeat)
+            # Global error at xf: the fixed-step rows store y before each step,
+            # the adaptive improved Euler rows store the value after it.
+            x_end = result["x"][-1] + (result["h"][-1] if method == "euler_adaptativo" else 0.0)
+            error = abs(float(result[column][-1]) - exact(x_end))
+            records.append({
+                "problem": name,
+                "method": method,
+                "parameters": parameters,
+                "steps": len(result),
+                "evaluations": evaluations,
+                "seconds": seconds,
+                "steps_per_second": len(result) / seconds if seconds else None,
+                "peak_memory_bytes": peak,
+                "global_error": error,
+            })
+    return records
+
+
+def benchmark_roots(repeat=3):
+    records = []
+    for name, function, derivative, x0, root in ROOT_PROBLEMS:
+        dfunc = compile_expression(derivative, ("x",))
+        result, evaluations, seconds, peak = _run(
+            lambda f: newton_solve(f, dfunc, x0, xtol=1e-15), function, ("x",), repeat,
+        )
+        records.append({
+            "problem": name,
+            "method": "newton_raphson",
+            "parameters": {"xtol": 1e-15},
+            "steps": len(result),
+            "evaluations": evaluations,
+            "seconds": seconds,
+            "steps_per_second": len(result) / seconds if seconds else None,
+            "peak_memory_bytes": peak,
+            "global_error": abs(result.info["root"] - root),
+            "converged": result.info["converged"],
+        })
+    return records
+
+
+def observed_orders(records):
+    # Slope of log(error) against log(h) between consecutive fixed-step runs.
+    orders = {}
+    for record in records:
+        if "h" not in record["parameters"]:
+            continue
+        orders.setdefault((record["problem"], record["method"]), []).append((record["parameters"]["h"], record["global_error"]))
+
+    summary = []
+    for (problem, method), points in orders.items():
+        points.sort()
+        slopes = [
+            math.log(e2 / e1) / math.log(h2 / h1)
+            for (h1, e1), (h2, e2) in zip(points, points[1:])
+            if e1 > 0 and e2 > 0
+        ]
+        summary.append({"problem": problem, "method": method, "order": float(np.median(slopes)) if slopes else None})
+    return summary
+
+
+def print_work_precision(records):
+    # One table per problem, cheapest runs first, to compare cost against accuracy.
+    for problem in dict.fromkeys(record["problem"] for record in records):
+        print(f"\n{problem}")
+        print(f"    {'método':<18}{'parámetros':<28}{'evaluaciones':>13}{'tiempo (ms)':>13}{'error':>12}")
+        rows = sorted((record for record in records if record["problem"] == problem), key=lambda record: record["evaluations"])
+        for record in rows:
+            parameters = ", ".join(f"{key}={value:g}" for key, value in record["parameters"].items())
+            print(f"    {record['method']:<18}{parameters:<28}{record['evaluations']:>13}"
+                  f"{record['seconds'] * 1000:>13.2f}{record['global_error']:>12.2e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara costo y precisión de los métodos de la calculadora.")
+    parser.add_argument("--json", metavar="RUTA", help="guarda los resultados en un archivo JSON ('-' para stdout)")
+    parser.add_argument("--repeat", type=int, default=3, help="ejecuciones por caso; se toma la más rápida")
+    parser.add_argument("--quick", action="store_true", help="solo los pasos y tolerancias más gruesos")
+    args = parser.parse_args(argv)
+
+    step_sizes = STEP_SIZES[:3] if args.quick else STEP_SIZES
+    tolerances = TOLERANCES[:2] if args.quick else TOLERANCES
+
+    ode_records = benchmark_odes(step_sizes, tolerances, args.repeat)
+    root_records = benchmark_roots(args.repeat)
+    report = {"odes": ode_records, "roots": root_records, "orders": observed_orders(ode_records)}
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=4)
+        print()
+        return
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=4)
+
+    print_work_precision(ode_records + root_records)
+    print("\nOrden observado")
+    for order in report["orders"]:
+        value = "-" if order["order"] is None else f"{order['order']:.2f}"
+        print(f"    {order['problem']:<14}{order['method']:<18}{value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import ast
+from functools import lru_cache
+import numpy as np
+
+# Functions and constants that user expressions may reference directly, e.g. "sin(x)".
+FUNCTIONS = {
+    "exp": np.exp,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "abs": np.abs,
+    "pi": np.pi,
+    "e": np.e,
+}
+
+# Attributes allowed after "np.", e.g. "np.sqrt(x)".
+NUMPY_ATTRIBUTES = {
+    "exp", "expm1", "log", "log10", "log2", "log1p", "sqrt", "cbrt", "abs", "sign",
+    "sin", "cos", "tan", "arcsin", "arccos", "arctan", "sinh", "cosh", "tanh",
+    "arcsinh", "arccosh", "arctanh", "power", "pi", "e",
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Attribute,
+    ast.Constant, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv,
+    ast.Mod, ast.Pow, ast.USub, ast.UAdd, ast.List, ast.Tuple, ast.Subscript,
+)
+
+
+def compile_expression(text, variables):
+    # Parses, validates and compiles a user expression into a function of the
+    # given variables. The result is cached, so repeated calls with the same
+    # text are free and the expression is never re-parsed inside a solver loop.
+    return _compile(text.strip(), tuple(variables))
+
+
+@lru_cache(maxsize=256)
+def _compile(text, variables):
+    if not text:
+        raise ValueError("Debes ingresar una función válida.")
+
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Expresión inválida: {text}") from None
+
+    _validate(tree, variables)
+
+    # A system is written as a list, e.g. "[y[1], -y[0]]"; it is evaluated
+    # into one float array so the solvers can update the state as a vector.
+    body = tree.body
+    if isinstance(body, (ast.List, ast.Tuple)):
+        numpy = ast.Name(id="np", ctx=ast.Load())
+        body = ast.Call(func=ast.Attribute(value=numpy, attr="array", ctx=ast.Load()),
+                        args=[body, ast.Attribute(value=numpy, attr="float64", ctx=ast.Load())], keywords=[])
+
+    # Wraps the validated body in a lambda so the compiled function is called directly.
+    arguments = ast.arguments(
+        posonlyargs=[], args=[ast.arg(arg=name) for name in variables], kwonlyargs=[],
+        kw_defaults=[], defaults=[],
+    )
+    function = ast.Expression(body=ast.Lambda(args=arguments, body=body))
+    ast.fix_missing_locations(function)
+    code = compile(function, "<expresión>", "eval")
+
+    namespace = {"__builtins__": {}, "np": np, **FUNCTIONS}
+    return eval(code, namespace)
+
+
+def _validate(tree, variables):
+    # Walks the syntax tree and rejects anything that is not plain arithmetic
+    # over the variables and the whitelisted functions.
+    # "np" may only appear as in "np.sqrt", never as a value of its own.
+    numpy_uses = {id(node.value) for node in ast.walk(tree) if isinstance(node, ast.Attribute)}
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Elemento no permitido en la expresión: {type(node).__name__}")
+
+        if isinstance(node, ast.Constant) and (type(node.value) is bool or not isinstance(node.value, (int, float))):
+            raise ValueError(f"Constante no permitida: {node.value!r}")
+
+        if isinstance(node, ast.Name) and node.id not in variables and node.id not in FUNCTIONS:
+            if node.id != "np" or id(node) not in numpy_uses:
+                raise ValueError(f"Nombre desconocido: {node.id}")
+
+        if isinstance(node, ast.Attribute):
+            if not (isinstance(node.value, ast.Name) and node.value.id == "np" and node.attr in NUMPY_ATTRIBUTES):
+                raise ValueError(f"Atributo no permitido: {ast.unparse(node)}")
+
+        if isinstance(node, ast.Call):
+            if node.keywords or not isinstance(node.func, (ast.Name, ast.Attribute)):
+                raise ValueError(f"Llamada no permitida: {ast.unparse(node)}")
+            if isinstance(node.func, ast.Name) and node.func.id in variables:
+                raise ValueError(f"Llamada no permitida: {ast.unparse(node)}")
+
+        if isinstance(node, (ast.List, ast.Tuple)) and node is not tree.body:
+            raise ValueError("Solo la expresión completa puede ser una lista: [f1, f2, ...]")
+
+        # Components of the state are read as y[0], y[1], ...
+        if isinstance(node, ast.Subscript):
+            index = node.slice
+            if isinstance(index, ast.UnaryOp) and isinstance(index.op, ast.USub):
+                index = index.operand
+            if not (isinstance(node.value, ast.Name) and node.value.id in variables
+                    and isinstance(index, ast.Constant) and type(index.value) is int):
+                raise ValueError(f"Índice no permitido: {ast.unparse(node)}")
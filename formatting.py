@@ -0,0 +1,28 @@
+# Presentation of solver values. The engines keep full float64 precision;
+# the number of decimals is only applied here, when rows are shown or exported,
+# so it can be changed without recomputing anything.
+
+
+def parse_precision(text):
+    # "" means full precision; anything else must be a non-negative integer.
+    text = str(text).strip()
+    if text == "":
+        return None
+    precision = int(text)
+    if precision < 0:
+        raise ValueError("Los decimales de precisión no pueden ser negativos.")
+    return precision
+
+
+def format_value(value, precision):
+    # Iteration numbers and full-precision output are left untouched; the
+    # state of a system is a list and each component is rounded.
+    if precision is None or isinstance(value, int):
+        return value
+    if isinstance(value, list):
+        return [format_value(component, precision) for component in value]
+    return round(value, precision)
+
+
+def format_row(row, precision):
+    return tuple(format_value(value, precision) for value in row)
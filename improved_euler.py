@@ -1,15 +1,27 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import numpy as np
+from tkinter import ttk, messagebox, simpledialog
 import json
-import pyperclip
+import time
+from virtual_table import VirtualTable
+from plot_panel import PlotPanel
+from worker import SolverWorker, WorkerMonitor
+from result_cache import solve_cached
+from profiling import profile_solve, profile_summary
+from stiff import IMPLICIT_METHODS
+from formatting import parse_precision
+from accelerated import improved_euler_solve
+from solvers import improved_euler_adaptive_solve, improved_euler_dense_solve, evaluation_points, extend_solve, initial_state, ode_function
+
+# Table columns for a run that lists every step, and for one that lists only evaluation points.
+STEP_COLUMNS = (("Iteración", "x", "y_n", "y_n+1", "Error"), ("Iteración", "x", "yₙ", "yₙ₊₁", "Error"))
+POINT_COLUMNS = (("Iteración", "x", "y"), ("Iteración", "x", "y"))
 
 class ImprovedEuler(tk.Toplevel):
     def __init__(self, master):
         super().__init__(master)
         
         self.title("Método de Euler Mejorado")
-        self.geometry("700x800")
+        self.geometry("800x950")
         self.resizable(False, True)
         self.configure(bg="#333333")
 
@@ -17,9 +29,18 @@ class ImprovedEuler(tk.Toplevel):
         self.style.configure("TFrame", background="#333333")
         self.style.configure("TLabel", background="#333333", foreground="white", font=("Arial", 16))
         self.style.configure("TButton", font=("Arial", 14), background="#444444", foreground="white")
+        self.style.configure("TCheckbutton", background="#333333", foreground="white", font=("Arial", 14))
+        self.style.configure("TRadiobutton", background="#333333", foreground="white", font=("Arial", 14))
         self.style.map("TButton", background=[("active", "#555555")])
+        self.style.configure("TNotebook", background="#333333")
 
-        self.results = []
+        self.result = None
+        self.function = None
+        self.x_target = None
+        self.mode = tk.StringVar(value="fixed")
+        self.higher_order = tk.BooleanVar(value=False)
+        self.profiling = tk.BooleanVar(value=False)
+        self.worker = None
         self._create_interface()
     
     def _create_interface(self):
@@ -32,21 +53,50 @@ class ImprovedEuler(tk.Toplevel):
         self.function_entry.pack(pady=5)
         
         self._create_numeric_input(frame, "Valor Inicial de x (x0):", "x0_entry")
-        self._create_numeric_input(frame, "Valor Inicial de y (y0):", "y0_entry")
+        self._create_numeric_input(frame, "Valor Inicial de y (y0; sistemas: 1, 0, ...):", "y0_entry")
+        # Systems take one initial value per equation, so y0 also accepts commas.
+        self.y0_entry.config(validatecommand=(self.register(self._validate_state), "%P"))
+        ttk.Checkbutton(frame, text="Orden superior: f da la derivada más alta de y", variable=self.higher_order,
+                        style="TCheckbutton").pack(pady=5)
+        ttk.Checkbutton(frame, text="Medir rendimiento (sin caché ni modo compilado)", variable=self.profiling,
+                        style="TCheckbutton").pack(pady=5)
         self._create_numeric_input(frame, "Tamaño de Paso (h):", "h_entry")
         self._create_numeric_input(frame, "Última Iteración (xf):", "x_target_entry")
+        ttk.Label(frame, text="Puntos de evaluación (opcional; 0.5, 1.2 o inicio:fin:paso):").pack(anchor="w")
+        self.points_entry = ttk.Entry(frame, width=30, font=("Arial", 14))
+        self.points_entry.pack(pady=5)
         self._create_numeric_input(frame, "Decimales de Precisión:", "precision_entry", default_value="4")
+        self.precision_entry.bind("<KeyRelease>", self._update_precision)
+        
+        mode_frame = ttk.Frame(frame, style="TFrame")
+        mode_frame.pack(pady=5)
+        ttk.Radiobutton(mode_frame, text="Paso fijo", variable=self.mode, value="fixed", style="TRadiobutton").pack(side="left", padx=5)
+        ttk.Radiobutton(mode_frame, text="Paso adaptativo", variable=self.mode, value="adaptive", style="TRadiobutton").pack(side="left", padx=5)
+        # Implicit methods for stiff equations, with a fixed h.
+        ttk.Radiobutton(mode_frame, text="Euler implícito", variable=self.mode, value="backward_euler", style="TRadiobutton").pack(side="left", padx=5)
+        ttk.Radiobutton(mode_frame, text="Trapecio", variable=self.mode, value="trapezoidal", style="TRadiobutton").pack(side="left", padx=5)
+        self._create_numeric_input(frame, "Tolerancia (adaptativo):", "tol_entry", default_value="0.0001")
+        
+        run_frame = ttk.Frame(frame, style="TFrame")
+        run_frame.pack(pady=10)
+        ttk.Button(run_frame, text="Calcular", command=self.calculate).pack(side="left", padx=5)
+        ttk.Button(run_frame, text="Cancelar", command=self.cancel).pack(side="left", padx=5)
+        ttk.Button(run_frame, text="Continuar", command=self.continue_calculation).pack(side="left", padx=5)
         
-        execute_button = ttk.Button(frame, text="Calcular", command=self.calculate)
-        execute_button.pack(pady=10)
+        self.progressbar = ttk.Progressbar(frame, mode="determinate", length=400)
+        self.progressbar.pack(pady=5)
         
-        self.tree = ttk.Treeview(frame, columns=("Iteración", "x", "y_n", "y_n+1", "Error"), show="headings")
-        self.tree.heading("Iteración", text="Iteración")
-        self.tree.heading("x", text="x")
-        self.tree.heading("y_n", text="yₙ")
-        self.tree.heading("y_n+1", text="yₙ₊₁")
-        self.tree.heading("Error", text="Error")
-        self.tree.pack(pady=10, fill="both", expand=True)
+        self.stats_label = ttk.Label(frame, text="", font=("Arial", 12))
+        self.stats_label.pack()
+        
+        # Results as a table and as a plot drawn while the solver runs; implicit runs and
+        # evaluation points have a "y" column instead of "y_n".
+        self.notebook = ttk.Notebook(frame)
+        self.notebook.pack(pady=10, fill="both", expand=True)
+        self.table = VirtualTable(self.notebook, *STEP_COLUMNS)
+        self.notebook.add(self.table, text="Tabla")
+        self.plot = PlotPanel(self.notebook, y_columns=("y_n", "y"), title="y(x)", width=760)
+        self.notebook.add(self.plot, text="Gráfica")
         
         control_frame = ttk.Frame(self, style="TFrame")
         control_frame.pack(side="bottom", fill="x", pady=10)
@@ -70,68 +120,195 @@ class ImprovedEuler(tk.Toplevel):
             return True
         return False
     
+    def _validate_state(self, value):
+        # One number, or several comma-separated numbers (possibly negative).
+        return all(self._validate_numeric(part.strip().lstrip("-")) for part in value.split(","))
+    
     def calculate(self):
+        # Starts the solver on a background thread; the window stays responsive
+        # and _on_finish shows the result once the thread ends.
+        if self.worker is not None and self.worker.is_alive():
+            return
+        
         try:
             function_str = self.function_entry.get()
             x0 = float(self.x0_entry.get())
-            y0 = float(self.y0_entry.get())
-            h = float(self.h_entry.get())
-            x_target = float(self.x_target_entry.get())
-            precision = int(self.precision_entry.get())
+            y0 = initial_state(self.y0_entry.get())
+            function = ode_function(function_str, y0, self.higher_order.get())
+            # With evaluation points the run ends at the last point, so xf is not needed.
+            points = evaluation_points(self.points_entry.get())
+            if points is not None and self.mode.get() != "fixed":
+                raise ValueError("Los puntos de evaluación solo se usan con paso fijo.")
+            x_target = float(self.x_target_entry.get()) if points is None else None
+            precision = parse_precision(self.precision_entry.get())
             
-            func = lambda x, y: eval(function_str, {"x": x, "y": y, "np": np, "exp": np.exp, "sin": np.sin, "cos": np.cos, "tan": np.tan})
+            if self.mode.get() == "adaptive":
+                tol = float(self.tol_entry.get())
+            else:
+                h = float(self.h_entry.get())
             
-            for entry in [self.function_entry, self.x0_entry, self.y0_entry, self.h_entry, self.x_target_entry, self.precision_entry]:
+            for entry in self._input_entries():
                 entry.config(state="disabled")
             
-            self.tree.delete(*self.tree.get_children())
-            self.results = []
+            self.table.set_columns(*(STEP_COLUMNS if points is None and self.mode.get() not in IMPLICIT_METHODS else POINT_COLUMNS))
+            self.table.clear()
+            self.table.set_precision(precision)
+            self.plot.start(x0, x_target if points is None else max(points))
+            self.result = None
+            self.function = function
+            self.x_target = x_target
+            self.stats_label.config(text="")
             
-            iterations = int(round((x_target - x0) / h)) + 1
-            x, y = x0, y0
-            for i in range(iterations):
-                y_pred = y + h * func(x, y)
-                y_corr = y + (h / 2) * (func(x, y) + func(x + h, y_pred))
-                error = abs(y_corr - y_pred)  # Cálculo del error absoluto
-                
-                self.results.append({
-                    "Iteración": i,
-                    "x": round(x, precision),
-                    "y_n": round(y, precision),
-                    "y_n+1": round(y_corr, precision),
-                    "Error": round(error, precision)
-                })
-                self.tree.insert("", "end", values=(i, round(x, precision), round(y, precision), round(y_corr, precision), round(error, precision)))
-                
-                y = y_corr
-                x += h
-            
-            # messagebox.showinfo("Resultado", "Cálculo completado.")
+            # Repeated runs come from the shared result cache; a larger xf continues the cached run.
+            # Measured runs are always computed with the NumPy engines, so they skip the cache.
+            run = profile_solve if self.profiling.get() else solve_cached
+            if self.mode.get() == "adaptive":
+                self.worker = SolverWorker(run, improved_euler_adaptive_solve, function, x0, y0, x_target, tol=tol)
+            elif self.mode.get() in IMPLICIT_METHODS:
+                self.worker = SolverWorker(run, IMPLICIT_METHODS[self.mode.get()], function, x0, y0, h, x_target)
+            elif points is not None:
+                self.worker = SolverWorker(run, improved_euler_dense_solve, function, x0, y0, h, points)
+            else:
+                self.worker = SolverWorker(run, improved_euler_solve, function, x0, y0, h, x_target)
+            WorkerMonitor(self, self.worker, self.progressbar, self._show_partial, self._on_finish)
         except Exception as e:
             messagebox.showerror("Error", f"Error: {str(e)}")
     
+    def _show_partial(self, partial):
+        # Rows computed so far: the table shows them all, the plot only draws the new ones.
+        self.table.update_data(partial)
+        self.plot.update_data(partial)
+    
+    def _on_finish(self, worker):
+        if worker.cancelled():
+            # Keeps the rows computed before the cancellation.
+            self.result = worker.partial
+            if worker.partial is not None:
+                self.plot.update_data(worker.partial)
+            self.stats_label.config(text="Cálculo cancelado.")
+            return
+        if worker.error is not None:
+            messagebox.showerror("Error", f"Error: {str(worker.error)}")
+            return
+        
+        self.result = worker.result
+        started = time.monotonic()
+        self.table.set_data(worker.result, self._precision())
+        self.plot.update_data(worker.result)
+        if "accepted_steps" in worker.result.info:
+            self.stats_label.config(text=f"Pasos aceptados: {worker.result.info['accepted_steps']}, rechazados: {worker.result.info['rejected_steps']}")
+        elif "factorizations" in worker.result.info:
+            info = worker.result.info
+            self.stats_label.config(text=f"Evaluaciones de f: {info['evaluations']}, jacobianos: {info['jacobian_evaluations']}, "
+                                         f"iteraciones de Newton: {info['newton_iterations']}")
+        elif "steps" in worker.result.info:
+            self.stats_label.config(text=f"Pasos calculados: {worker.result.info['steps']}, puntos mostrados: {len(worker.result)}")
+        elif "backend" in worker.result.info:
+            self.stats_label.config(text=f"Modo compilado: {worker.result.info['backend']}")
+        self._show_profile(worker, started)
+        # messagebox.showinfo("Resultado", "Cálculo completado.")
+    
+    def _show_profile(self, worker, started):
+        # Adds the table time to the profile of a measured run and shows it under the stats.
+        profile = worker.result.info.get("profile")
+        if profile is None:
+            return
+        profile["display_seconds"] = worker.display_time + time.monotonic() - started
+        text = self.stats_label.cget("text")
+        self.stats_label.config(text=(text + "\n" if text else "") + profile_summary(profile))
+
+    def continue_calculation(self):
+        # Extends the finished run to a larger xf from its checkpoint; the rows
+        # already in the table are kept and only the new ones are computed.
+        if self.worker is not None and self.worker.is_alive():
+            return
+        if self.result is None or self.result.checkpoint is None:
+            messagebox.showerror("Error", "Error: No hay un cálculo terminado que continuar.")
+            return
+        
+        x_target = simpledialog.askfloat("Continuar", "Nuevo valor de xf:", parent=self)
+        if x_target is None:
+            return
+        if x_target <= self.x_target:
+            messagebox.showerror("Error", f"Error: El nuevo xf debe ser mayor que {self.x_target}.")
+            return
+        
+        self.stats_label.config(text="")
+        self.worker = SolverWorker(extend_solve, self.result, self.function, x_target)
+        # The partial rows of a continuation are only the new ones, so the table keeps the full result until
+        # the end, while the plot draws them after the rows it already has.
+        self.plot.extend_x(x_target)
+        first = len(self.result)
+        WorkerMonitor(self, self.worker, self.progressbar, lambda partial: self.plot.update_data(partial, first),
+                      self._on_continue)
+    
+    def _on_continue(self, worker):
+        if worker.cancelled():
+            self.stats_label.config(text="Continuación cancelada; se conservan los resultados anteriores.")
+            return
+        if worker.error is None:
+            # The profile of the first run does not describe the continuation.
+            worker.result.info.pop("profile", None)
+            self.x_target = worker.args[-1]
+            state = self.x_target_entry.cget("state")
+            self.x_target_entry.config(state="normal")
+            self.x_target_entry.delete(0, "end")
+            self.x_target_entry.insert(0, repr(self.x_target))
+            self.x_target_entry.config(state=state)
+        self._on_finish(worker)
+    
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+    
+    def _precision(self):
+        # Decimals shown in the table and the JSON export; the solver itself never rounds.
+        try:
+            return parse_precision(self.precision_entry.get())
+        except ValueError:
+            return None
+    
+    def _update_precision(self, event=None):
+        # Re-renders the visible rows with the new number of decimals, without recomputing.
+        self.table.set_precision(self._precision())
+    
+    def _input_entries(self):
+        # The precision entry is left out: it stays editable while and after calculating.
+        return [self.function_entry, self.x0_entry, self.y0_entry, self.h_entry, self.x_target_entry, self.points_entry, self.tol_entry]
+    
     def clear_inputs(self):
-        for entry in [self.function_entry, self.x0_entry, self.y0_entry, self.h_entry, self.x_target_entry, self.precision_entry]:
+        for entry in self._input_entries() + [self.precision_entry]:
             entry.config(state="normal")
             entry.delete(0, "end")
         
         self.precision_entry.insert(0, "4")
-        self.tree.delete(*self.tree.get_children())
-        self.results = []
+        self.tol_entry.insert(0, "0.0001")
+        self.table.clear()
+        self.plot.clear()
+        self.stats_label.config(text="")
+        self.result = None
     
     def edit_inputs(self):
-        for entry in [self.function_entry, self.x0_entry, self.y0_entry, self.h_entry, self.x_target_entry, self.precision_entry]:
+        for entry in self._input_entries():
             entry.config(state="normal")
     
     def copy_as_json(self):
+        import pyperclip  # Only needed when copying, so it is not loaded at startup.
+
         data = {
+            "method": "improved_euler",
             "function": self.function_entry.get(),
             "x0": self.x0_entry.get(),
             "y0": self.y0_entry.get(),
+            "higher_order": self.higher_order.get(),
             "step_size": self.h_entry.get(),
             "target_x": self.x_target_entry.get(),
+            "points": self.points_entry.get(),
             "precision": self.precision_entry.get(),
-            "results": self.results
+            "mode": self.mode.get(),
+            "tolerance": self.tol_entry.get(),
+            "profile": self.result.info.get("profile") if self.result is not None else None,
+            "results": self.result.records(self._precision()) if self.result is not None else []
         }
         json_data = json.dumps(data, indent=4)
         pyperclip.copy(json_data)
@@ -140,7 +317,7 @@ class ImprovedEuler(tk.Toplevel):
     def show_guide(self):
         guide_window = tk.Toplevel(self)
         guide_window.title("Guía de Uso")
-        guide_window.geometry("400x300")
+        guide_window.geometry("450x560")
         guide_window.configure(bg="#333333")
         
         ttk.Label(guide_window, text="Guía para escribir funciones", font=("Arial", 12, "bold"), background="#333333", foreground="white").pack(pady=10)
@@ -151,7 +328,19 @@ class ImprovedEuler(tk.Toplevel):
             "- Trigonometría: np.sin(x), np.cos(x), np.tan(x)\n"
             "- Exponencial: np.exp(x) (para e^x)\n"
             "- Logaritmo: np.log(x) (logaritmo natural)\n"
-            "- Multiplicación explícita: x*y (no xy)"
+            "- Multiplicación explícita: x*y (no xy)\n"
+            "- Sistemas: [y[1], -y[0]] con y0 = 1, 0\n"
+            "- Orden superior: y'' = -y se escribe -y con y0 = y(x0), y'(x0);\n"
+            "  usa y, dy, d2y, ... para y, y', y'', ...\n"
+            "- Puntos de evaluación: muestra y solo en esos x (en lugar\n"
+            "  de cada paso); el cálculo llega hasta el último punto\n"
+            "- Continuar: lleva el último cálculo hasta un xf mayor sin\n"
+            "  repetir los pasos ya calculados\n"
+            "- Ecuaciones rígidas (y' = -1000*(y - np.cos(x))): usa\n"
+            "  Euler implícito, estable con h grande (o BDF2 en la\n"
+            "  ventana de Runge-Kutta); Trapecio oscila si h es grande\n"
+            "- Gráfica: se dibuja mientras se calcula; cada píxel muestra\n"
+            "  el mínimo y el máximo de y entre sus puntos"
         )
         
         ttk.Label(guide_window, text=guide_text, background="#333333", foreground="white", justify="left").pack(padx=10, pady=5)
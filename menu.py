@@ -1,12 +1,16 @@
+import importlib
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-import improved_euler
-import newton_raphson
-import runge_kutta
+
+# The method windows pull in NumPy and SymPy, so they are imported the first
+# time a method is opened instead of before the menu appears.
+PREWARM_MODULES = ("improved_euler", "runge_kutta", "newton_raphson", "sympy")
+PREWARM_DELAY = 200  # ms after the menu is shown
 
 class Menu(tk.Tk):
     # Function to initialize the calculator.
-    def __init__(self):
+    def __init__(self, prewarm=True):
         super().__init__()
 
         # Sets the title, size, and background color of the calculator.
@@ -28,6 +32,10 @@ class Menu(tk.Tk):
         # Creates the interface for the calculator.
         self._create_interface()
 
+        # Loads the method modules in the background once the menu is visible.
+        if prewarm:
+            self.after(PREWARM_DELAY, self._start_prewarm)
+
     # Function to create the interface for the calculator.
     def _create_interface(self):
         # Main container with padding
@@ -71,19 +79,34 @@ class Menu(tk.Tk):
         
         match method:
             case 1:
-                improved_euler.ImprovedEuler(self)
+                self._load("improved_euler", "ImprovedEuler")(self)
             case 2:
-                runge_kutta.RungeKutta(self)
+                self._load("runge_kutta", "RungeKutta")(self)
             case 3:
-                newton_raphson.NewtonRaphson(self)
+                self._load("newton_raphson", "NewtonRaphson")(self)
             case _:
                 messagebox.showerror("Error", "Please select a valid method.")
 
+    def _load(self, module_name, class_name):
+        # Imports a method module on demand; it is instant once pre-warmed.
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def _start_prewarm(self):
+        threading.Thread(target=_prewarm, daemon=True).start()
+
     def close(self):
         # Closes the application with a farewell message.
         # messagebox.showinfo("Exit", "Hasta luego!!!")
         self.destroy()
 
+def _prewarm():
+    # Imports the heavy modules ahead of time; failures are left for when the method is opened.
+    for module_name in PREWARM_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+
 if __name__ == "__main__":
     app = Menu()
     app.mainloop()
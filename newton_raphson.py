@@ -1,16 +1,38 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import json
-import pyperclip
-import sympy as sp
+import time
+from formatting import format_value, parse_precision
+from symbolic import differentiate
+from virtual_table import VirtualTable
+from plot_panel import PlotPanel
+from worker import SolverWorker, WorkerMonitor
+from result_cache import solve_cached
+from profiling import profile_solve, profile_summary
+from solvers import newton_solve, newton_multistart
+
+# Delay after the last keystroke before the derivative is recomputed, in ms.
+DERIVATIVE_DELAY = 300
+
+# SymPy runs on this thread so typing never waits for it.
+_derivative_executor = ThreadPoolExecutor(max_workers=1)
+
+# Messages shown for each reason newton_solve can stop with.
+STOP_REASONS = {
+    "converged": "El método convergió.",
+    "max_iterations": "Se alcanzó el máximo de iteraciones sin converger.",
+    "zero_derivative": "Derivada igual a cero. No se puede continuar.",
+    "diverged": "Valor demasiado grande. Se detiene el cálculo.",
+    "overflow": "Cálculo fuera de rango. Se detiene el proceso.",
+}
 
 class NewtonRaphson(tk.Toplevel):
     def __init__(self, master):
         super().__init__(master)
 
         self.title("Método de Newton-Raphson")
-        self.geometry("600x650")
+        self.geometry("600x950")
         self.resizable(False, True)
         self.configure(bg="#333333")
 
@@ -18,9 +40,15 @@ class NewtonRaphson(tk.Toplevel):
         self.style.configure("TFrame", background="#333333")
         self.style.configure("TLabel", background="#333333", foreground="white", font=("Arial", 16))
         self.style.configure("TButton", font=("Arial", 14), background="#444444", foreground="white")
+        self.style.configure("TCheckbutton", background="#333333", foreground="white", font=("Arial", 14))
         self.style.map("TButton", background=[("active", "#555555")])
+        self.style.configure("TNotebook", background="#333333")
 
-        self.results = []
+        self.result = None
+        self.profiling = tk.BooleanVar(value=False)
+        self.worker = None
+        self._derivative_job = None
+        self._shown_derivative = ""
         self._create_interface()
 
     def _create_interface(self):
@@ -40,15 +68,44 @@ class NewtonRaphson(tk.Toplevel):
 
         self._create_numeric_input(frame, "Valor Inicial (x0):", "x0_entry")
         self._create_numeric_input(frame, "Decimales de Precisión:", "precision_entry", default_value="4")
-
-        execute_button = ttk.Button(frame, text="Calcular", command=self.calculate)
-        execute_button.pack(pady=10)
-
-        self.tree = ttk.Treeview(frame, columns=("Iteración", "x", "Xn+1"), show="headings")
-        self.tree.heading("Iteración", text="Iteración")
-        self.tree.heading("x", text="Xn")
-        self.tree.heading("Xn+1", text="Xn+1")
-        self.tree.pack(pady=10, fill="both", expand=True)
+        self.precision_entry.bind("<KeyRelease>", self._update_precision)
+        self._create_numeric_input(frame, "Máximo de Iteraciones:", "max_iterations_entry", default_value="100")
+        ttk.Checkbutton(frame, text="Medir rendimiento (sin caché)", variable=self.profiling,
+                        style="TCheckbutton").pack(pady=5)
+
+        # Interval searched by "Buscar Raíces"
+        interval_frame = ttk.Frame(frame, style="TFrame")
+        interval_frame.pack(pady=5)
+        ttk.Label(interval_frame, text="Intervalo [a, b]:").pack(side="left")
+        self.a_entry = self._create_interval_input(interval_frame, "-10")
+        self.b_entry = self._create_interval_input(interval_frame, "10")
+
+        run_frame = ttk.Frame(frame, style="TFrame")
+        run_frame.pack(pady=10)
+        execute_button = ttk.Button(run_frame, text="Calcular", command=self.calculate)
+        execute_button.pack(side="left", padx=5)
+        roots_button = ttk.Button(run_frame, text="Buscar Raíces", command=self.find_roots)
+        roots_button.pack(side="left", padx=5)
+        cancel_button = ttk.Button(run_frame, text="Cancelar", command=self.cancel)
+        cancel_button.pack(side="left", padx=5)
+
+        self.progressbar = ttk.Progressbar(frame, mode="determinate", length=400)
+        self.progressbar.pack(pady=5)
+
+        self.stats_label = ttk.Label(frame, text="", font=("Arial", 12))
+        self.stats_label.pack()
+
+        # Iterations as a table, as Xn against n and as |f(Xn)| on a log scale, where
+        # quadratic convergence shows as a curve that bends down faster and faster.
+        self.notebook = ttk.Notebook(frame)
+        self.notebook.pack(pady=10, fill="both", expand=True)
+        self.table = VirtualTable(self.notebook, columns=("Iteración", "x", "Xn+1"), headings=("Iteración", "Xn", "Xn+1"))
+        self.notebook.add(self.table, text="Tabla")
+        self.iterates_plot = PlotPanel(self.notebook, x_column="Iteración", y_columns=("x",), title="Xn", width=560)
+        self.notebook.add(self.iterates_plot, text="Iteraciones")
+        self.convergence_plot = PlotPanel(self.notebook, x_column="Iteración", y_columns=("f(x)",), title="|f(Xn)|",
+                                          log_y=True, width=560)
+        self.notebook.add(self.convergence_plot, text="Convergencia")
 
         control_frame = ttk.Frame(self, style="TFrame")
         control_frame.pack(side="bottom", fill="x", pady=10)
@@ -77,107 +134,213 @@ class NewtonRaphson(tk.Toplevel):
         if default_value:
             entry.insert(0, default_value)
 
+    def _create_interval_input(self, parent, default_value):
+        entry = ttk.Entry(parent, width=8, validate="key", font=("Arial", 14),
+                          validatecommand=(self.register(self._validate_numeric), "%P"))
+        entry.pack(side="left", padx=5)
+        entry.insert(0, default_value)
+        return entry
+
     def _validate_numeric(self, value):
+        # Accepts an optional leading minus sign so negative starting points and intervals can be typed.
+        value = value[1:] if value.startswith("-") else value
         return value == "" or value.replace(".", "", 1).isdigit()
 
-    def update_derivative(self, event=None):
+    def _input_entries(self):
+        # The precision entry stays editable: after a run it only changes how the rows are shown.
+        return [self.function_entry, self.derivative_entry, self.x0_entry, self.max_iterations_entry, self.a_entry, self.b_entry]
+
+    def _precision(self):
         try:
-            function_str = self.function_entry.get()
-            if function_str.strip() == "":
-                self.derivative_entry.config(state="normal")
-                self.derivative_entry.delete(0, "end")
-                self.derivative_entry.config(state="readonly")
-                return
+            return parse_precision(self.precision_entry.get())
+        except ValueError:
+            return None
 
-            x = sp.symbols("x")
-            function_expr = sp.sympify(function_str, locals={"np": np})
-            derivative_expr = sp.diff(function_expr, x)
+    def _update_precision(self, event=None):
+        self.table.set_precision(self._precision())
 
-            self.derivative_entry.config(state="normal")
-            self.derivative_entry.delete(0, "end")
-            self.derivative_entry.insert(0, str(derivative_expr))
-            self.derivative_entry.config(state="readonly")
-        except Exception:
-            pass
+    def update_derivative(self, event=None):
+        # Debounces keystrokes: the derivative is only recomputed once typing pauses.
+        if self._derivative_job is not None:
+            self.after_cancel(self._derivative_job)
+        self._derivative_job = self.after(DERIVATIVE_DELAY, self._compute_derivative)
+
+    def _compute_derivative(self):
+        self._derivative_job = None
+        function_str = self.function_entry.get()
+        if function_str.strip() == "":
+            self._show_derivative("")
+            return
+
+        future = _derivative_executor.submit(differentiate, function_str)
+        self._wait_for_derivative(future, function_str)
+
+    def _wait_for_derivative(self, future, function_str):
+        if not future.done():
+            self.after(20, self._wait_for_derivative, future, function_str)
+            return
+        # Ignores invalid expressions and results for text that has changed since.
+        if future.exception() is None and self.function_entry.get() == function_str:
+            self._show_derivative(future.result()[0])
+
+    def _show_derivative(self, text):
+        self.derivative_entry.config(state="normal")
+        self.derivative_entry.delete(0, "end")
+        self.derivative_entry.insert(0, text)
+        self.derivative_entry.config(state="readonly")
+        self._shown_derivative = text
+
+    def _derivative_function(self, derivative_str):
+        # f' is computed from f by automatic differentiation, so the SymPy
+        # derivative in the entry is only shown. A derivative typed by hand
+        # after "Editar" is used as written.
+        if derivative_str == "" or derivative_str == self._shown_derivative:
+            return None
+        return derivative_str
 
     def calculate(self):
+        # Runs the iteration on a background thread so a slow or non-converging
+        # function never blocks the application.
+        if self.worker is not None and self.worker.is_alive():
+            return
+
         try:
             function_str = self.function_entry.get()
             derivative_str = self.derivative_entry.get()
             x0 = float(self.x0_entry.get())
-            precision = int(self.precision_entry.get())
+            # Also sets the stopping tolerance: half a unit in the last requested decimal.
+            precision = parse_precision(self.precision_entry.get())
+            max_iterations = int(self.max_iterations_entry.get())
 
-            if not function_str or not derivative_str:
+            if not function_str:
                 messagebox.showerror("Error", "Debes ingresar una función válida.")
                 return
 
-            func = lambda x: eval(function_str, {"x": x, "np": np})
-            dfunc = lambda x: eval(derivative_str, {"x": x, "np": np})
+            derivative = self._derivative_function(derivative_str)
 
-            for entry in [self.function_entry, self.derivative_entry, self.x0_entry, self.precision_entry]:
+            for entry in self._input_entries():
                 entry.config(state="disabled")
 
-            self.tree.delete(*self.tree.get_children())
-            self.results = []
-
-            x = x0
-            i = 0
-            MAX_LIMIT = 1e100  # Límite de valores permitidos para evitar errores
-
-            while True:
-                try:
-                    fx = func(x)
-                    dfx = dfunc(x)
-
-                    if dfx == 0:
-                        # messagebox.showerror("Error", "Derivada igual a cero. No se puede continuar.")
-                        break
+            self.table.clear()
+            self.table.set_precision(precision)
+            self._clear_plots()
+            self.result = None
+            self.stats_label.config(text="")
 
-                    x_new = x - fx / dfx
+            # Measured runs are always computed, so they skip the result cache.
+            run = profile_solve if self.profiling.get() else solve_cached
+            self.worker = SolverWorker(run, newton_solve, function_str, derivative, x0, precision, max_iterations=max_iterations)
+            WorkerMonitor(self, self.worker, self.progressbar, self.table.update_data, self._on_finish)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error: {str(e)}")
 
-                    # Verificar si el nuevo valor es demasiado grande
-                    if abs(x_new) > MAX_LIMIT:
-                        # messagebox.showwarning("Advertencia", "Valor demasiado grande. Se detiene el cálculo.")
-                        break
+    def _on_finish(self, worker):
+        if worker.cancelled():
+            self.stats_label.config(text="Cálculo cancelado.")
+            return
+        if worker.error is not None:
+            messagebox.showerror("Error", f"Error: {str(worker.error)}")
+            return
+
+        self.result = worker.result
+        started = time.monotonic()
+        self.table.set_data(worker.result, self._precision())
+        self._plot(worker.result)
+        self.stats_label.config(text=STOP_REASONS[worker.result.info["reason"]])
+        self._show_profile(worker, started)
+        # messagebox.showinfo("Resultado", "Cálculo completado.")
+
+    def _plot(self, result):
+        # A Newton run has few iterations, so both plots are drawn once it ends.
+        for plot in (self.iterates_plot, self.convergence_plot):
+            plot.start(0, max(1, len(result) - 1))
+            plot.update_data(result)
+
+    def _clear_plots(self):
+        self.iterates_plot.clear()
+        self.convergence_plot.clear()
+
+    def _show_profile(self, worker, started):
+        # Adds the table time to the profile of a measured run and shows it under the stats.
+        profile = worker.result.info.get("profile")
+        if profile is None:
+            return
+        profile["display_seconds"] = worker.display_time + time.monotonic() - started
+        text = self.stats_label.cget("text")
+        self.stats_label.config(text=(text + "\n" if text else "") + profile_summary(profile))
+
+    def find_roots(self):
+        # Runs Newton from a grid of starting points in [a, b] and lists every distinct root found.
+        if self.worker is not None and self.worker.is_alive():
+            return
 
-                    rounded_x = round(x_new, precision)
+        try:
+            function_str = self.function_entry.get()
+            derivative_str = self.derivative_entry.get()
+            a = float(self.a_entry.get())
+            b = float(self.b_entry.get())
 
-                    self.results.append({"Iteración": i, "x": round(x, precision), "Xn+1": rounded_x})
-                    self.tree.insert("", "end", values=(i, round(x, precision), rounded_x))
+            if not function_str:
+                messagebox.showerror("Error", "Debes ingresar una función válida.")
+                return
 
-                    # Condición de parada: Si el valor de Xn redondeado no cambia, detener iteraciones
-                    if round(x, precision) == rounded_x:
-                        break
+            self.stats_label.config(text="")
+            self._clear_plots()
+            derivative = self._derivative_function(derivative_str)
+            self.worker = SolverWorker(newton_multistart, function_str, derivative, a, b)
+            WorkerMonitor(self, self.worker, self.progressbar, self.table.update_data, self._on_roots_found)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error: {str(e)}")
 
-                    x = x_new
-                    i += 1
+    def _on_roots_found(self, worker):
+        if worker.cancelled():
+            self.stats_label.config(text="Cálculo cancelado.")
+            return
+        if worker.error is not None:
+            messagebox.showerror("Error", f"Error: {str(worker.error)}")
+            return
 
-                except OverflowError:
-                    # messagebox.showwarning("Advertencia", "Cálculo fuera de rango. Se detiene el proceso.")
-                    break
+        roots = [format_value(root, self._precision()) for root in worker.result.tolist()]
+        if roots:
+            messagebox.showinfo("Raíces", f"Raíces encontradas en el intervalo: {roots}")
+        else:
+            messagebox.showinfo("Raíces", "No se encontraron raíces en el intervalo.")
 
-            # messagebox.showinfo("Resultado", "Cálculo completado.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error: {str(e)}")
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
 
     def clear_inputs(self):
-        for entry in [self.function_entry, self.derivative_entry, self.x0_entry, self.precision_entry]:
+        for entry in self._input_entries() + [self.precision_entry]:
             entry.config(state="normal")
             entry.delete(0, "end")
-        self.tree.delete(*self.tree.get_children())
-        self.results = []
+        self.precision_entry.insert(0, "4")
+        self.max_iterations_entry.insert(0, "100")
+        self.a_entry.insert(0, "-10")
+        self.b_entry.insert(0, "10")
+        self.table.clear()
+        self._clear_plots()
+        self.stats_label.config(text="")
+        self.result = None
 
     def edit_inputs(self):
-        for entry in [self.function_entry, self.derivative_entry, self.x0_entry, self.precision_entry]:
+        for entry in self._input_entries():
             entry.config(state="normal")
 
     def copy_as_json(self):
+        import pyperclip  # Only needed when copying, so it is not loaded at startup.
+
         data = {
+            "method": "newton_raphson",
             "function": self.function_entry.get(),
-            "derivative": self.derivative_entry.get(),
+            # Only a derivative typed by hand is used by batch_runner; the SymPy one is for reading.
+            "derivative": self._derivative_function(self.derivative_entry.get()) or "",
+            "symbolic_derivative": self._shown_derivative,
             "x0": self.x0_entry.get(),
             "precision": self.precision_entry.get(),
-            "results": self.results
+            "max_iterations": self.max_iterations_entry.get(),
+            "profile": self.result.info.get("profile") if self.result is not None else None,
+            "results": self.result.records(self._precision()) if self.result is not None else []
         }
         pyperclip.copy(json.dumps(data, indent=4))
         messagebox.showinfo("Copiado", "Resultados copiados como JSON.")
@@ -185,7 +348,7 @@ class NewtonRaphson(tk.Toplevel):
     def show_guide(self):
         guide_window = tk.Toplevel(self)
         guide_window.title("Guía de Uso")
-        guide_window.geometry("400x200")
+        guide_window.geometry("400x280")
         guide_window.configure(bg="#333333")
 
         ttk.Label(guide_window, text="Guía para escribir funciones", font=("Arial", 12, "bold"),
@@ -197,6 +360,9 @@ class NewtonRaphson(tk.Toplevel):
             "- Trigonometría: np.sin(x), np.cos(x), np.tan(x)\n"
             "- Exponencial: np.exp(x)\n"
             "- Logaritmo: np.log(x)\n"
+            "- La derivada se calcula sola al iterar; la que se\n"
+            "  muestra es solo informativa\n"
+            "- Convergencia: |f(Xn)| en escala logarítmica\n"
         )
         ttk.Label(guide_window, text=guide_text, background="#333333", foreground="white",
                   justify="left").pack(padx=10, pady=5)
@@ -0,0 +1,67 @@
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from batch_runner import run_job
+
+# Characters copied at a time from a job's spool file to the output.
+COPY_SIZE = 1 << 20
+
+
+def init_worker():
+    # Loads the solver stack once per process instead of once per job. Each
+    # process keeps its own compile_expression cache, so jobs that share an
+    # expression only compile it once per worker.
+    import numpy  # noqa: F401
+    import solvers  # noqa: F401
+
+
+def run_task(task):
+    # Runs one job in a worker process. Rows are collected as JSON lines and
+    # sent back with the summary unless they go straight to an output file,
+    # so it is only meant for jobs known to be short (the service checks).
+    index, job, options = task
+    rows = io.StringIO()
+    summary = run_job(index, job, rows, **options)
+    return index, summary, rows.getvalue()
+
+
+def spool_task(task):
+    # Runs one job in a worker process with its rows written to a file of its
+    # own in "spool"; only the summary and the file's path go back to the
+    # parent, so no process ever holds a job's full rows in memory.
+    index, job, spool, options = task
+    path = os.path.join(spool, f"job_{index}.jsonl")
+    with open(path, "w", encoding="utf-8") as rows:
+        summary = run_job(index, job, rows, **options)
+    return index, summary, path
+
+
+def run_jobs_parallel(jobs, rows_out, summary_out, workers=None, chunksize=8, ordered=True, timeout=None,
+                      default_method="runge_kutta", summary_only=False, output_dir=None, output_format="jsonl"):
+    # Distributes the jobs over a pool of processes, "chunksize" jobs per
+    # hand-off. With ordered=True the output matches run_jobs exactly;
+    # otherwise each job is written as soon as it finishes. "timeout" is
+    # enforced inside each worker, so one runaway job only costs its own slot.
+    # Rows are spooled to temporary files and copied to rows_out piece by
+    # piece; in ordered mode the files of jobs that finish early wait on disk.
+    options = {
+        "default_method": default_method,
+        "summary_only": summary_only,
+        "output_dir": output_dir,
+        "timeout": timeout,
+        "output_format": output_format,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="batch_rows_") as spool, \
+            multiprocessing.Pool(workers or os.cpu_count(), initializer=init_worker) as pool:
+        tasks = ((index, job, spool, options) for index, job in enumerate(jobs))
+        mapper = pool.imap if ordered else pool.imap_unordered
+        for index, summary, path in mapper(spool_task, tasks, chunksize):
+            with open(path, encoding="utf-8") as rows:
+                shutil.copyfileobj(rows, rows_out, COPY_SIZE)
+            os.remove(path)
+            summary_out.write(json.dumps(summary, ensure_ascii=False) + "\n")
+            summary_out.flush()
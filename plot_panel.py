@@ -0,0 +1,188 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+
+# Colors of the components of y, repeated for larger systems.
+COLORS = ("#4fc3f7", "#ffb74d", "#81c784", "#e57373", "#ba68c8", "#fff176")
+
+# Space around the plot area for the axis labels, in pixels.
+MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 70, 10, 20, 25
+
+# Extra room added when the y range grows, as a fraction of the new span, so a
+# run that keeps growing does not rescale the plot on every update.
+GROWTH_MARGIN = 0.25
+
+
+def decimate(x, y, x_min, scale, columns):
+    # Min/max decimation: rows are grouped by the pixel column their x falls
+    # in and every group is reduced to its first, lowest, highest and last y.
+    # Drawn in that order the group is a vertical stroke joined to its
+    # neighbours, which looks the same as drawing every row, for 10^3 or 10^7
+    # rows. y has one column per component; x is expected in increasing order.
+    ids = np.clip(np.floor((x - x_min) * scale), 0, columns - 1).astype(np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    ends = np.append(starts[1:], len(x)) - 1
+    # fmin/fmax skip NaN, e.g. |f| = 0 on a log scale.
+    return ids[starts], y[starts], np.fmin.reduceat(y, starts), np.fmax.reduceat(y, starts), y[ends]
+
+
+class PlotPanel(ttk.Frame):
+    # Plot of one or more columns of a run against another, drawn on a Tk
+    # Canvas while the solver is still running. Only the rows added since the
+    # last update are decimated and drawn; when the axes have to grow, the
+    # existing lines are moved with Canvas.scale instead of being redrawn, so
+    # an update costs about the same at the first row and at the 10^7th.
+    def __init__(self, master, x_column="x", y_columns=("y",), title="", log_y=False, width=640, height=300):
+        super().__init__(master, style="TFrame")
+        self.x_column = x_column
+        self.y_columns = y_columns
+        self.title = title
+        self.log_y = log_y
+        self.width = width
+        self.height = height
+        self.columns = width - MARGIN_LEFT - MARGIN_RIGHT
+        self.plot_height = height - MARGIN_TOP - MARGIN_BOTTOM
+
+        self.canvas = tk.Canvas(self, width=width, height=height, bg="#222222", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.clear()
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.x_min = self.x_max = None
+        self.y_low = self.y_high = None
+        self.rows = 0
+        # Group of the last pixel column, still open to more rows, and the last point already drawn.
+        self.open = None
+        self.last = None
+
+    def start(self, x_min, x_max):
+        # New run whose x goes from x_min to x_max.
+        self.clear()
+        self.x_min = float(x_min)
+        self.x_max = float(x_max) if x_max > x_min else float(x_min) + 1.0
+        self.canvas.create_rectangle(MARGIN_LEFT, MARGIN_TOP, MARGIN_LEFT + self.columns, MARGIN_TOP + self.plot_height,
+                                     outline="#888888")
+        self.canvas.create_text(self.width - MARGIN_RIGHT, 4, text=self.title, anchor="ne", fill="white",
+                                font=("Arial", 10))
+        self._draw_labels()
+
+    def extend_x(self, x_max):
+        # Widens the x axis for the rows of a continuation; what is already
+        # drawn is compressed to the new scale.
+        if self.x_min is None or x_max <= self.x_max:
+            return
+        if self.open is not None:
+            self._draw(tuple(values[None] for values in self.open), "data")
+            self.open = None
+        self.canvas.delete("tail")
+        self.canvas.scale("data", MARGIN_LEFT, 0, (self.x_max - self.x_min) / (x_max - self.x_min), 1)
+        self.x_max = float(x_max)
+        self._draw_labels()
+
+    def update_data(self, data, offset=0):
+        # Draws the rows of "data" (a SolverResult, possibly a partial one)
+        # that are not on the plot yet. The rows of data are those of the run
+        # from row "offset" on, e.g. the new rows of a continuation.
+        if self.x_min is None or len(data) == 0:
+            return
+        name = next((column for column in self.y_columns if column in data.columns), None)
+        first = max(0, self.rows - offset)
+        if name is None or first >= len(data):
+            return
+
+        x = np.asarray(data[self.x_column][first:], dtype=float)
+        y = np.asarray(data[name][first:], dtype=float).reshape(len(x), -1)
+        self.rows = offset + len(data)
+        if self.log_y:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                y = np.log10(np.abs(y))
+            y[~np.isfinite(y)] = np.nan
+
+        groups = decimate(x, y, self.x_min, self._scale(), self.columns)
+        if self.open is not None:
+            ids, firsts, lows, highs, lasts = groups
+            if ids[0] == self.open[0]:
+                # The first rows continue the open pixel column.
+                lows[0] = np.fmin(lows[0], self.open[2])
+                highs[0] = np.fmax(highs[0], self.open[3])
+                firsts[0] = self.open[1]
+            else:
+                groups = tuple(np.concatenate(([old], new)) for old, new in zip(self.open, groups))
+
+        self._grow_y(groups[2], groups[3])
+        closed = tuple(values[:-1] for values in groups)
+        self.open = tuple(values[-1] for values in groups)
+        self.canvas.delete("tail")
+        if len(closed[0]):
+            self._draw(closed, "data")
+        self._draw(tuple(values[None] for values in self.open), "tail", keep_last=False)
+
+    def _scale(self):
+        return self.columns / (self.x_max - self.x_min)
+
+    def _draw(self, groups, tag, keep_last=True):
+        # One polyline per component through the groups, joined to the last point drawn before them.
+        ids, firsts, lows, highs, lasts = groups
+        scale = self._scale()
+        xs = np.repeat(self.x_min + (ids + 0.5) / scale, 4)
+
+        for component in range(firsts.shape[1]):
+            ys = np.column_stack((firsts[:, component], lows[:, component], highs[:, component], lasts[:, component])).ravel()
+            line_x, line_y = xs, ys
+            if self.last is not None and component < len(self.last[1]):
+                line_x = np.concatenate(([self.last[0]], xs))
+                line_y = np.concatenate(([self.last[1][component]], ys))
+            keep = np.isfinite(line_y)
+            if np.count_nonzero(keep) >= 2:
+                points = np.column_stack((MARGIN_LEFT + (line_x[keep] - self.x_min) * scale, self._pixel_y(line_y[keep])))
+                self.canvas.create_line(*points.ravel().tolist(), fill=COLORS[component % len(COLORS)], tags=tag)
+
+        if keep_last:
+            self.last = (xs[-1], lasts[-1])
+
+    def _pixel_y(self, values):
+        return MARGIN_TOP + (self.y_high - values) * self.plot_height / (self.y_high - self.y_low)
+
+    def _grow_y(self, lows, highs):
+        # Widens the y axis to the new values, moving what is already drawn.
+        finite = np.concatenate((np.ravel(lows), np.ravel(highs)))
+        finite = finite[np.isfinite(finite)]
+        if finite.size == 0:
+            return
+        low, high = float(finite.min()), float(finite.max())
+        if self.y_low is not None and low >= self.y_low and high <= self.y_high:
+            return
+
+        if self.y_low is None:
+            span = high - low or abs(high) or 1.0
+            new_low, new_high = low - 0.05 * span, high + 0.05 * span
+        else:
+            low, high = min(low, self.y_low), max(high, self.y_high)
+            margin = GROWTH_MARGIN * (high - low)
+            new_low = low - margin if low < self.y_low else self.y_low
+            new_high = high + margin if high > self.y_high else self.y_high
+        if self.log_y:
+            # Whole decades, so the axis reads 1e-12 ... 1e+00.
+            new_low, new_high = float(np.floor(new_low)), float(np.ceil(new_high))
+        if self.y_low is not None:
+            factor = (self.y_high - self.y_low) / (new_high - new_low)
+            self.canvas.scale("data", 0, MARGIN_TOP, 1, factor)
+            self.canvas.move("data", 0, (new_high - self.y_high) * self.plot_height / (new_high - new_low))
+        self.y_low, self.y_high = new_low, new_high
+        self._draw_labels()
+
+    def _draw_labels(self):
+        self.canvas.delete("labels")
+        bottom = MARGIN_TOP + self.plot_height
+        right = MARGIN_LEFT + self.columns
+        options = {"fill": "white", "font": ("Arial", 10), "tags": "labels"}
+        self.canvas.create_text(MARGIN_LEFT, bottom + 4, text=f"{self.x_min:.4g}", anchor="nw", **options)
+        self.canvas.create_text(right, bottom + 4, text=f"{self.x_max:.4g}", anchor="ne", **options)
+        if self.y_low is not None:
+            self.canvas.create_text(MARGIN_LEFT - 4, MARGIN_TOP, text=self._y_label(self.y_high), anchor="ne", **options)
+            self.canvas.create_text(MARGIN_LEFT - 4, bottom, text=self._y_label(self.y_low), anchor="se", **options)
+
+    def _y_label(self, value):
+        # On a log scale the axis holds log10 of the values.
+        return f"{10.0 ** value:.0e}" if self.log_y else f"{value:.4g}"
@@ -0,0 +1,133 @@
+import time
+from contextlib import contextmanager
+from solvers import as_function
+
+# Solvers whose second argument is the derivative f'(x) and whose expressions
+# only use x; every other solver integrates an f(x, y).
+ROOT_FINDERS = ("newton_solve",)
+
+
+class Profile:
+    # Where the time of one solver run goes: how many times each expression
+    # was evaluated and how long that took, the time spent in progress
+    # callbacks and presenting the rows (table updates in the GUI, writing
+    # files in batch_runner), and the rest, which is the stepping itself.
+    # "callbacks" are called as callback(x, y) after every step, like on_step.
+    def __init__(self, callbacks=()):
+        self.callbacks = list(callbacks)
+        self.evaluations = {}
+        self.evaluation_time = 0.0
+        self.callback_time = 0.0
+        self.display_time = 0.0
+        self.total_time = 0.0
+        self.steps = 0
+        self._started = None
+
+    def counted(self, function, name="f", variables=("x", "y")):
+        # The function (or compiled expression) with every call counted and timed.
+        func = as_function(function, variables)
+        self.evaluations.setdefault(name, 0)
+
+        def counted_function(*args):
+            start = time.perf_counter()
+            value = func(*args)
+            self.evaluation_time += time.perf_counter() - start
+            self.evaluations[name] += 1
+            return value
+
+        # What is being counted, e.g. for stiff.py to differentiate the expression.
+        counted_function.__wrapped__ = function
+        return counted_function
+
+    def on_step(self, x, y):
+        self.steps += 1
+        for callback in self.callbacks:
+            callback(x, y)
+
+    def timed(self, progress):
+        # Progress callback that also records how long the callback itself takes.
+        if progress is None:
+            return None
+
+        def timed_progress(*args):
+            start = time.perf_counter()
+            try:
+                progress(*args)
+            finally:
+                self.callback_time += time.perf_counter() - start
+
+        return timed_progress
+
+    def start(self):
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.total_time += time.perf_counter() - self._started
+
+    def add_display_time(self, seconds):
+        self.display_time += seconds
+
+    @contextmanager
+    def displaying(self):
+        # Time spent presenting rows between start() and stop(); it is kept
+        # out of total_time and counted as display time instead.
+        self.stop()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_display_time(time.perf_counter() - start)
+            self.start()
+
+    def as_dict(self):
+        # Machine-readable form, used in result.info, the JSON export and batch summaries.
+        stepping = max(0.0, self.total_time - self.evaluation_time - self.callback_time)
+        return {
+            "evaluations": dict(self.evaluations),
+            "steps": self.steps,
+            "evaluations_per_step": sum(self.evaluations.values()) / self.steps if self.steps else None,
+            "total_seconds": self.total_time,
+            "evaluation_seconds": self.evaluation_time,
+            "stepping_seconds": stepping,
+            "callback_seconds": self.callback_time,
+            "display_seconds": self.display_time,
+            "steps_per_second": self.steps / self.total_time if self.total_time > 0 else None,
+        }
+
+
+def profile_solve(solver, function, *args, profile=None, on_step=None, progress=None, **kwargs):
+    # Same as solver(function, *args, progress=progress, **kwargs) with the
+    # expressions counted and the run timed; the breakdown is returned in
+    # result.info["profile"]. Counted functions are plain callables, so the
+    # compiled backend of accelerated.py and the result cache are bypassed:
+    # the run is always really computed, with the NumPy engines.
+    profile = Profile() if profile is None else profile
+    if on_step is not None:
+        profile.callbacks.append(on_step)
+
+    variables = ("x",) if solver.__name__ in ROOT_FINDERS else ("x", "y")
+    function = profile.counted(function, "f", variables)
+    # Root finders without a derivative get f' from f by automatic differentiation.
+    if solver.__name__ in ROOT_FINDERS and args[0] is not None:
+        args = (profile.counted(args[0], "df", variables),) + args[1:]
+
+    profile.start()
+    try:
+        result = solver(function, *args, progress=profile.timed(progress), on_step=profile.on_step, **kwargs)
+    finally:
+        profile.stop()
+    result.info["profile"] = profile.as_dict()
+    return result
+
+
+def profile_summary(profile):
+    # Short description of a profile dict for the stats label of the windows.
+    evaluations = ", ".join(f"{name} = {count}" for name, count in profile["evaluations"].items())
+    if profile["evaluations_per_step"] is not None:
+        evaluations += f" ({profile['evaluations_per_step']:.2f} por paso)"
+    text = (f"Evaluaciones: {evaluations}\n"
+            f"Expresión: {profile['evaluation_seconds'] * 1000:.1f} ms, pasos: {profile['stepping_seconds'] * 1000:.1f} ms, "
+            f"tabla: {profile['display_seconds'] * 1000:.1f} ms")
+    if profile["steps_per_second"] is not None:
+        text += f", {profile['steps_per_second']:.0f} pasos/s"
+    return text
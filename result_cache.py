@@ -0,0 +1,165 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from result_store import load_result, save_result
+from solvers import extend_solve
+from symbolic import normalize
+
+# Engines whose runs can be extended to a larger xf from their checkpoint;
+# x_target is the last of their positional arguments.
+RESUMABLE = ("improved_euler_solve", "rk4_solve", "improved_euler_adaptive_solve", "rk45_solve")
+
+
+class ResultCache:
+    # Completed solver results keyed by method and inputs, shared by every
+    # window. At most "max_entries" results and "max_bytes" of column data are
+    # kept in memory, least recently used first out. With a directory the
+    # results are also written there as .npz and survive a restart.
+    def __init__(self, max_entries=32, max_bytes=256 * 2**20, directory=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+                return result
+
+        path = self._path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            result = load_result(path, mmap=False)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        # Results are shared, so their columns are made read-only.
+        for column in result.columns.values():
+            column.flags.writeable = False
+        self._remember(key, result)
+
+        path = self._path(key)
+        if path is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            save_result(path, result)
+
+    def find(self, match):
+        # Most recently used (key, result) in memory whose key satisfies "match".
+        with self.lock:
+            for key in reversed(self.entries):
+                if match(key):
+                    return key, self.entries[key]
+        return None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _remember(self, key, result):
+        size = _nbytes(result)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= _nbytes(self.entries.pop(key))
+            self.entries[key] = result
+            self.size += size
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= _nbytes(evicted)
+
+    def _path(self, key):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, hashlib.sha256(repr(key).encode("utf-8")).hexdigest() + ".npz")
+
+
+def _nbytes(result):
+    return sum(column.nbytes for column in result.columns.values())
+
+
+# Cache used by the calculator windows; CALCULADORA_CACHE_DIR makes it persistent.
+CACHE = ResultCache(directory=os.environ.get("CALCULADORA_CACHE_DIR") or None)
+
+
+class _Unkeyable(Exception):
+    pass
+
+
+def _value_key(value):
+    # Expression strings are compared without whitespace and numbers as floats.
+    # Callables can only be keyed when they say what they compute through a
+    # "cache_key" attribute (see solvers.reduce_order and symbolic.differentiate).
+    if isinstance(value, str):
+        return normalize(value)
+    if callable(value):
+        if getattr(value, "cache_key", None) is None:
+            raise _Unkeyable
+        return value.cache_key
+    if isinstance(value, bool) or value is None:
+        return value
+    if np.ndim(value):
+        return tuple(np.asarray(value, dtype=float).ravel().tolist())
+    return float(value)
+
+
+def call_key(solver, function, args, kwargs):
+    # (solver, inputs, options) with every value in a hashable, canonical
+    # form, or None when some input cannot be keyed.
+    try:
+        values = tuple(_value_key(value) for value in (function,) + tuple(args))
+        options = tuple(sorted((name, _value_key(value)) for name, value in kwargs.items()))
+    except (_Unkeyable, TypeError, ValueError):
+        return None
+    return (solver.__module__, solver.__name__, values, options)
+
+
+def solve_cached(solver, function, *args, cache=None, progress=None, **kwargs):
+    # Same as solver(function, *args, progress=progress, **kwargs), but a run
+    # with the same inputs is returned from the cache, and a run that only
+    # differs in a larger xf continues from the checkpoint of the cached one.
+    cache = CACHE if cache is None else cache
+    key = call_key(solver, function, args, kwargs)
+    if key is None:
+        return solver(function, *args, progress=progress, **kwargs)
+
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    if solver.__name__ in RESUMABLE and args:
+        result = _extend(cache, key, function, args[-1], progress)
+    if result is None:
+        result = solver(function, *args, progress=progress, **kwargs)
+    cache.put(key, result)
+    return result
+
+
+def _extend(cache, key, function, x_target, progress):
+    module, name, values, options = key
+
+    def same_run(other):
+        return (other[:2] == (module, name) and other[3] == options and other[2][:-1] == values[:-1]
+                and other[2][-1] < x_target)
+
+    found = cache.find(same_run)
+    if found is None or found[1].checkpoint is None:
+        return None
+
+    # Only the new rows report progress; the cached prefix is already known.
+    def extension_progress(done, steps, partial=None):
+        if progress is not None:
+            progress(done, steps)
+
+    return extend_solve(found[1], function, x_target, extension_progress)
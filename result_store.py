@@ -0,0 +1,98 @@
+import json
+import struct
+import numpy as np
+from solvers import SolverResult
+
+# Size reserved for the .npy header written by ResultWriter. The row count is
+# only known at the end, so the header is rewritten in place with the same size.
+HEADER_SIZE = 512
+
+
+def result_dtype(result):
+    # Structured dtype with one field per column, e.g. ("x", float64). The
+    # state of a system is stored as a subarray field, e.g. ("y", float64, (2,)).
+    return np.dtype([(name, column.dtype, column.shape[1:]) for name, column in result.columns.items()])
+
+
+def to_records(result):
+    # Packs the columns of a result into one structured array, one record per row.
+    records = np.empty(len(result), dtype=result_dtype(result))
+    for name, column in result.columns.items():
+        records[name] = column
+    return records
+
+
+def save_result(path, result):
+    # .npy stores the rows as a structured array that load_result can
+    # memory-map; .npz stores one array per column plus the run info and the
+    # checkpoint, so the run can still be continued after loading it.
+    if path.endswith(".npz"):
+        extra = {"__info__": np.array(json.dumps(result.info))}
+        if result.checkpoint is not None:
+            extra["__checkpoint__"] = np.array(json.dumps(result.checkpoint, default=_to_list))
+        np.savez(path, **result.columns, **extra)
+    else:
+        np.save(path, to_records(result))
+
+
+def _to_list(value):
+    # Vector states of a checkpoint; continue_solve turns them back into arrays.
+    return np.asarray(value).tolist()
+
+
+def load_result(path, mmap=True):
+    # Reopens a saved result. For .npy files the columns are views of a
+    # read-only memory map, so only the rows that are accessed are read.
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files if name not in ("__info__", "__checkpoint__")}
+            info = json.loads(str(data["__info__"])) if "__info__" in data.files else {}
+            checkpoint = json.loads(str(data["__checkpoint__"])) if "__checkpoint__" in data.files else None
+        return SolverResult(columns, info, checkpoint)
+
+    records = np.load(path, mmap_mode="r" if mmap else None)
+    return SolverResult({name: records[name] for name in records.dtype.names})
+
+
+class ResultWriter:
+    # Writes a result to a .npy file chunk by chunk while it is being computed,
+    # e.g. from an engine's progress callback or the chunks of batch_runner.
+    # Only the current chunk is ever in memory; the file can be reopened with
+    # load_result once the writer is closed.
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self.file = open(path, "wb")
+        self.file.write(_npy_header(self.dtype, 0))
+
+    def append(self, result):
+        # Adds the rows of a SolverResult (or a structured array of the same dtype).
+        records = result if isinstance(result, np.ndarray) else to_records(result)
+        records.astype(self.dtype, copy=False).tofile(self.file)
+        self.count += len(records)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(_npy_header(self.dtype, self.count))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _npy_header(dtype, count):
+    # .npy format 3.0 header (UTF-8, so column names such as "Iteración" are
+    # allowed) padded with spaces to exactly HEADER_SIZE bytes.
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (count,)})
+    prefix = np.lib.format.MAGIC_PREFIX + bytes([3, 0])
+    length = HEADER_SIZE - len(prefix) - 4
+    body = header.encode("utf-8")
+    if len(body) + 1 > length:
+        raise ValueError("Demasiadas columnas para el encabezado del archivo.")
+    return prefix + struct.pack("<I", length) + body + b" " * (length - len(body) - 1) + b"\n"
@@ -0,0 +1,466 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from batch_runner import JobTimeout, job_precision, job_value, time_limit, run_job
+from expressions import compile_expression
+from parallel import init_worker, run_task
+from solvers import (
+    SolverCancelled, SolverResult, iteration_count, evaluation_points, improved_euler_batch, initial_state, rk4_batch,
+)
+from symbolic import normalize
+
+# Local HTTP/JSON service for other tools, without the Tk windows. Every
+# endpoint takes a job with the fields of the GUI forms (the same JSON the
+# windows export and batch_runner reads) and answers with JSON lines: the rows,
+# then one summary line, exactly like batch_runner. Solves run in a pool of
+# processes. Short fixed-step runs of the same equation that arrive while the
+# pool is busy are merged into one vectorized batch (improved_euler_batch,
+# rk4_batch); long runs are streamed back chunk by chunk as they are solved.
+# Only the standard library is used: asyncio for the connections and a
+# minimal HTTP/1.1 parser.
+
+ENDPOINTS = {"/improved_euler": "improved_euler", "/runge_kutta": "runge_kutta", "/newton_raphson": "newton_raphson"}
+
+# Runs with more rows than this are streamed from the worker while they are solved.
+STREAM_ROWS = 10_000
+
+# Fixed-step runs up to this many rows can be merged into a batch; the batch
+# keeps the whole trajectory of every run in memory.
+BATCH_ROWS = 10_000
+
+# Largest number of runs merged into one batch.
+BATCH_SIZE = 256
+
+# Rows text collected in a worker before it is sent to the service.
+STREAM_BUFFER = 64 * 1024
+
+# Largest request body accepted, in bytes.
+MAX_BODY = 2**20
+
+# Seconds a job may run when --timeout is not given. The service takes
+# expressions from the network, so a job is never allowed to hold a worker
+# for good.
+DEFAULT_TIMEOUT = 60.0
+
+# Fields of a job and the JSON types they may have; y0 and points also take
+# a list, for systems and for the evaluation points.
+TEXT_FIELDS = ("function", "derivative", "mode", "backend")
+NUMBER_FIELDS = ("x0", "step_size", "target_x", "precision", "max_iterations", "tolerance", "rtol", "atol", "a", "b",
+                 "starts")
+LIST_FIELDS = ("y0", "points")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class _QueueWriter:
+    # File-like target for run_job in a worker process: rows are collected and
+    # put on the queue of the request in pieces of about STREAM_BUFFER bytes.
+    # A disconnected client sets "cancel", which stops the run at the next piece.
+    def __init__(self, pieces, cancel):
+        self.pieces = pieces
+        self.cancel = cancel
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= STREAM_BUFFER:
+            self.flush()
+
+    def flush(self):
+        if self.cancel.is_set():
+            raise SolverCancelled("Cliente desconectado.")
+        if self.buffer:
+            self.pieces.put("".join(self.buffer))
+            self.buffer = []
+            self.size = 0
+
+
+def _stream_task(index, job, pieces, cancel, options):
+    # Runs one long job in a worker process, sending its rows as they are
+    # solved; None on the queue marks the end of the rows.
+    writer = _QueueWriter(pieces, cancel)
+    try:
+        summary = run_job(index, job, writer, **options)
+        writer.flush()
+    except SolverCancelled:
+        summary = None
+    finally:
+        pieces.put(None)
+    return summary
+
+
+def _batch_task(method, function, entries, timeout=None):
+    # Solves fixed-step runs of the same scalar equation as one vectorized
+    # batch in a worker process. "entries" holds (index, job, summary_only);
+    # returns (index, summary, rows) for each, the same as parallel.run_task.
+    # The rows are those of the single-trajectory engines: x on the grid
+    # x0 + n*h and, for improved Euler, the predictor-corrector difference.
+    try:
+        x0 = np.array([job_value(job, "x0") for _, job, _ in entries])
+        y0 = np.array([job_value(job, "y0") for _, job, _ in entries])
+        h = np.array([job_value(job, "step_size") for _, job, _ in entries])
+        rows = np.array([iteration_count(x, step, job_value(job, "target_x"))
+                         for x, step, (_, job, _) in zip(x0, h, entries)])
+        # Improved Euler rows also hold the y after their step, one more than RK4.
+        steps = rows if method == "improved_euler" else rows - 1
+        batch = improved_euler_batch if method == "improved_euler" else rk4_batch
+        with time_limit(timeout):
+            trajectory = batch(function, x0, y0, h, x0 + steps * h, store_trajectory=True).trajectory
+            func = compile_expression(function, ("x", "y"))
+
+            results = []
+            for k, (index, job, summary_only) in enumerate(entries):
+                n = rows[k]
+                xs = x0[k] + np.arange(n) * h[k]
+                if method == "improved_euler":
+                    ys, y_next = trajectory[:n, k], trajectory[1:n + 1, k]
+                    error = np.abs(y_next - (ys + h[k] * func(xs, ys)))
+                    columns = {"Iteración": np.arange(n), "x": xs, "y_n": ys, "y_n+1": y_next, "Error": error}
+                else:
+                    columns = {"Iteración": np.arange(n), "x": xs, "y": trajectory[:n, k]}
+                result = SolverResult(columns, {"batch_size": len(entries)})
+                results.append((index, _batch_summary(index, result, job), "" if summary_only else _lines(index, result, job)))
+        return results
+    except JobTimeout as e:
+        return [(index, {"job": index, "status": "timeout", "error": str(e)}, "") for index, _, _ in entries]
+    except Exception as e:
+        return [(index, {"job": index, "status": "error", "error": str(e)}, "") for index, _, _ in entries]
+
+
+def _lines(index, result, job):
+    precision = job_precision(job)
+    return "".join(json.dumps({"job": index, **record}, ensure_ascii=False) + "\n" for record in result.records(precision))
+
+
+def _batch_summary(index, result, job):
+    precision = job_precision(job)
+    last = result.tail(1).records(precision)[0] if len(result) else None
+    return {"job": index, "status": "ok", "rows": len(result), "last": last, "info": result.info}
+
+
+def check_job(job):
+    # Rejects a job whose fields have the wrong JSON type before the response
+    # starts, so the client gets a 400 instead of a stream cut short.
+    if not isinstance(job.get("function"), str):
+        raise ValueError("Falta el campo 'function' o no es texto.")
+    for key, value in job.items():
+        if value is None:
+            continue
+        if key in TEXT_FIELDS and not isinstance(value, str):
+            raise ValueError(f"El campo '{key}' debe ser texto.")
+        number = isinstance(value, (int, float, str)) and not isinstance(value, bool)
+        if key in NUMBER_FIELDS and not number:
+            raise ValueError(f"El campo '{key}' debe ser un número.")
+        if key in LIST_FIELDS and not (number or isinstance(value, list)):
+            raise ValueError(f"El campo '{key}' debe ser un número, texto o una lista.")
+
+
+def expected_rows(job, method):
+    # Rows a job will produce, or None when that is only known after solving
+    # (adaptive runs) or the job is invalid (run_job reports the error).
+    try:
+        if method == "newton_raphson" and job.get("mode") == "roots":
+            # At most one root per start.
+            return job_value(job, "starts", 200, int)
+        if method == "newton_raphson":
+            return job_value(job, "max_iterations", 100, int)
+        points = job.get("points")
+        if points is not None:
+            return len(evaluation_points(points) if isinstance(points, str) else points)
+        if job.get("mode") == "adaptive":
+            return None
+        return iteration_count(job_value(job, "x0"), job_value(job, "step_size"), job_value(job, "target_x"))
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def batch_key(job, method, rows):
+    # Runs that can share a batch: the same method and equation, a plain fixed
+    # step, a scalar y and few enough rows. None for any other job.
+    if method == "newton_raphson" or rows is None or not 0 < rows <= BATCH_ROWS:
+        return None
+    if job.get("mode") not in (None, "", "fixed") or job.get("points") is not None:
+        return None
+    if job.get("higher_order") or job.get("profile") or job.get("backend"):
+        return None
+    try:
+        if np.ndim(job_value(job, "y0", cast=initial_state)):
+            return None
+        return method, normalize(job["function"])
+    except (ValueError, TypeError, KeyError, SyntaxError):
+        return None
+
+
+class SolverService:
+    # Schedules the jobs of every connection on one pool of "workers"
+    # processes. Batchable jobs wait in a group per equation while every
+    # worker is busy, so an idle service answers each one right away and a
+    # loaded one merges what queued up into a single vectorized run.
+    def __init__(self, workers=None, timeout=DEFAULT_TIMEOUT):
+        self.workers = workers or os.cpu_count()
+        self.timeout = timeout
+        self.pool = ProcessPoolExecutor(self.workers, initializer=init_worker)
+        # Queues shared with the workers for streamed runs, and threads that wait on them.
+        self.manager = multiprocessing.Manager()
+        self.readers = ThreadPoolExecutor(max(32, 4 * self.workers))
+        self.groups = {}
+        self.busy = 0
+        self.next_index = 0
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.readers.shutdown(wait=False)
+        self.manager.shutdown()
+
+    async def solve(self, job, send, summary_only=False):
+        # Runs one job, passing its JSON lines text to the coroutine "send" as
+        # it becomes available. Returns the summary, which reports any failure
+        # (a broken pool, an unexpected job) once the rows may have started.
+        index = self.next_index
+        self.next_index += 1
+        try:
+            return await self._solve(index, job, send, summary_only)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            return {"job": index, "status": "error", "error": str(e) or type(e).__name__}
+
+    async def _solve(self, index, job, send, summary_only):
+        method = job["method"]
+        rows = expected_rows(job, method)
+
+        key = batch_key(job, method, rows)
+        if key is not None:
+            _, summary, text = await self._batched(key, index, job, summary_only)
+        elif rows is not None and rows <= STREAM_ROWS:
+            options = {"summary_only": summary_only, "timeout": self.timeout}
+            _, summary, text = await self._submit(run_task, (index, job, options))
+        else:
+            return await self._stream(index, job, send, summary_only)
+
+        if text:
+            await send(text)
+        return summary
+
+    async def _submit(self, function, *args):
+        self.busy += 1
+        return await self._run_reserved(function, *args)
+
+    async def _run_reserved(self, function, *args):
+        # Runs on a worker already counted in "busy", and releases it at the end.
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.pool, function, *args)
+        finally:
+            self.busy -= 1
+            self._dispatch()
+
+    def _batched(self, key, index, job, summary_only):
+        future = asyncio.get_running_loop().create_future()
+        self.groups.setdefault(key, []).append((index, job, summary_only, future))
+        # Deferred, so the requests read in the same pass of the loop are grouped too.
+        asyncio.get_running_loop().call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self):
+        # Starts the oldest waiting groups while there are idle workers. The
+        # worker is reserved here, before the group's task gets to run, so one
+        # pass never starts more groups than there are idle workers.
+        while self.groups and self.busy < self.workers:
+            key = next(iter(self.groups))
+            group = self.groups[key][:BATCH_SIZE]
+            del self.groups[key][:BATCH_SIZE]
+            if not self.groups[key]:
+                del self.groups[key]
+            self.busy += 1
+            asyncio.ensure_future(self._run_group(key, group))
+
+    async def _run_group(self, key, group):
+        entries = [(index, job, summary_only) for index, job, summary_only, _ in group]
+        try:
+            results = await self._run_reserved(_batch_task, key[0], key[1], entries, self.timeout)
+        except Exception as e:
+            results = [(index, {"job": index, "status": "error", "error": str(e)}, "") for index, _, _ in entries]
+        for result, (_, _, _, future) in zip(results, group):
+            if not future.done():
+                future.set_result(result)
+
+    async def _stream(self, index, job, send, summary_only):
+        loop = asyncio.get_running_loop()
+        pieces = self.manager.Queue()
+        cancel = self.manager.Event()
+        options = {"summary_only": summary_only, "timeout": self.timeout}
+        task = asyncio.ensure_future(self._submit(_stream_task, index, job, pieces, cancel, options))
+
+        def next_piece():
+            try:
+                return pieces.get(timeout=1.0)
+            except queue.Empty:
+                return ""
+
+        try:
+            while True:
+                piece = await loop.run_in_executor(self.readers, next_piece)
+                if piece is None or (piece == "" and task.done()):
+                    break
+                await send(piece)
+        except (ConnectionError, asyncio.CancelledError):
+            cancel.set()
+            raise
+        return await task
+
+
+async def _read_request(reader):
+    # (method, target, version, headers, body) of the next request, or None
+    # when the client closed the connection.
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("Línea de petición inválida.")
+    method, target, version = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        return method, target, version, headers, None
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+class _Response:
+    # Streamed response: chunked for HTTP/1.1 clients, and for HTTP/1.0 ones
+    # plain bytes until the connection closes.
+    def __init__(self, writer, chunked):
+        self.writer = writer
+        self.chunked = chunked
+
+    async def start(self, status, content_type, keep_alive):
+        headers = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Type: {content_type}",
+                   "Connection: " + ("keep-alive" if keep_alive else "close")]
+        if self.chunked:
+            headers.append("Transfer-Encoding: chunked")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+
+    async def send(self, text):
+        data = text.encode("utf-8")
+        if not data:
+            return
+        if self.chunked:
+            self.writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            self.writer.write(data)
+        await self.writer.drain()
+
+    async def end(self):
+        if self.chunked:
+            self.writer.write(b"0\r\n\r\n")
+        await self.writer.drain()
+
+
+async def _send_json(writer, status, data, keep_alive):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                 .encode("latin-1") + body)
+    await writer.drain()
+
+
+async def handle_connection(service, reader, writer):
+    # Serves the requests of one connection in order; HTTP/1.1 connections
+    # are kept open between requests unless the client asks otherwise.
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                await _send_json(writer, 400, {"status": "error", "error": "Petición HTTP inválida."}, False)
+                break
+            if request is None:
+                break
+            method, target, version, headers, body = request
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            url = urlsplit(target)
+
+            if url.path == "/health":
+                await _send_json(writer, 200, {"status": "ok", "workers": service.workers, "busy": service.busy},
+                                 keep_alive)
+            elif url.path not in ENDPOINTS:
+                await _send_json(writer, 404, {"status": "error", "error": f"Ruta desconocida: {url.path}"}, keep_alive)
+            elif method != "POST":
+                await _send_json(writer, 405, {"status": "error", "error": "Usa POST con el trabajo en JSON."}, keep_alive)
+            elif body is None:
+                await _send_json(writer, 413, {"status": "error", "error": "El trabajo es demasiado grande."}, False)
+                break
+            else:
+                try:
+                    job = json.loads(body or b"{}")
+                    if not isinstance(job, dict):
+                        raise ValueError("El trabajo debe ser un objeto JSON.")
+                    check_job(job)
+                except ValueError as e:
+                    await _send_json(writer, 400, {"status": "error", "error": str(e)}, keep_alive)
+                else:
+                    job["method"] = ENDPOINTS[url.path]
+                    # ?summary=1 answers with the summary line only, like batch_runner --summary.
+                    summary_only = parse_qs(url.query).get("summary", ["0"])[0] not in ("0", "")
+                    response = _Response(writer, chunked=version == "HTTP/1.1")
+                    keep_alive = keep_alive and response.chunked
+                    await response.start(200, "application/x-ndjson", keep_alive)
+                    summary = await service.solve(job, response.send, summary_only)
+                    await response.send(json.dumps(summary, ensure_ascii=False) + "\n")
+                    await response.end()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None, timeout=DEFAULT_TIMEOUT):
+    service = SolverService(workers, timeout)
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    print(f"Servicio en http://{host}:{port} con {service.workers} procesos", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local con los métodos de la calculadora.")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección en la que escuchar (por defecto solo local)")
+    parser.add_argument("--port", type=int, default=8765, help="puerto (por defecto 8765)")
+    parser.add_argument("--workers", type=int, default=0, help="procesos de cálculo; 0 usa todos los núcleos")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"segundos máximos por trabajo (por defecto {DEFAULT_TIMEOUT:g})")
+    args = parser.parse_args(argv)
+    if not args.timeout > 0:
+        parser.error("--timeout debe ser mayor que cero")
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers or None, args.timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
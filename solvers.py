@@ -0,0 +1,785 @@
+import numpy as np
+from autodiff import value_and_derivative
+from expressions import compile_expression
+from formatting import format_row
+
+# Number of iterations between two calls of an engine's progress callback.
+# The single-trajectory engines also take an "on_step" callback, called as
+# on_step(x, y) after every accepted step (Newton: on_step(Xn, f(Xn)) on
+# every iteration), e.g. to count steps or follow a run point by point.
+PROGRESS_INTERVAL = 1024
+
+
+class SolverCancelled(Exception):
+    # Raised from a progress callback to stop an engine before it finishes.
+    pass
+
+
+class BatchResult:
+    # Final state of every trajectory of a batch run. "trajectory" holds the
+    # y values of each step (NaN once a trajectory has finished) when requested.
+    def __init__(self, x, y, steps, trajectory=None):
+        self.x = x
+        self.y = y
+        self.steps = steps
+        self.trajectory = trajectory
+
+
+def as_function(function, variables):
+    # Accepts either an expression string or an already compiled callable.
+    if isinstance(function, str):
+        return compile_expression(function, variables)
+    return function
+
+
+def initial_state(value):
+    # Initial y of an ODE. A single number gives a scalar equation; several
+    # comma-separated values ("1, 0") or a sequence give the state of a system
+    # as a float array, with f returning one component per equation.
+    if isinstance(value, str):
+        parts = value.split(",")
+        if len(parts) == 1:
+            return float(parts[0])
+        value = [float(part) for part in parts]
+    if np.ndim(value) == 0:
+        return float(value)
+
+    state = np.array(value, dtype=float)
+    if state.ndim != 1 or state.size == 0:
+        raise ValueError("y0 debe ser un número o una lista de números.")
+    return state
+
+
+def derivative_names(order):
+    # Names of y and its derivatives in an equation of the given order: y, dy, d2y, ...
+    names = ("y", "dy") + tuple(f"d{k}y" for k in range(2, order))
+    return names[:order]
+
+
+def reduce_order(function, order):
+    # Rewrites y^(order) = f(x, y, dy, d2y, ...) as a first-order system in the
+    # state [y, y', ..., y^(order-1)], so any of the ODE engines can solve it.
+    # E.g. reduce_order("-y", 2) is the system [y[1], -y[0]].
+    if order < 1:
+        raise ValueError("El orden de la ecuación debe ser al menos 1.")
+    if order == 1:
+        return as_function(function, ("x", "y"))
+
+    highest = as_function(function, ("x",) + derivative_names(order))
+
+    def system(x, y):
+        return np.append(y[1:], highest(x, *y))
+
+    # Lets result_cache recognise the same equation in a later run, and the
+    # implicit solvers of stiff.py differentiate it symbolically.
+    if isinstance(function, str):
+        system.cache_key = ("reduce_order", "".join(function.split()), order)
+        system.expression, system.order = function, order
+    return system
+
+
+def ode_function(function, y0, higher_order=False):
+    # The f to integrate for the initial state y0: f itself, or, for a
+    # higher-order equation, its reduction to a system of len(y0) equations.
+    return reduce_order(function, np.size(y0)) if higher_order else function
+
+
+def ode_setup(function, y0, x0):
+    # Compiles f and converts y0. For systems f must return one value per
+    # component, otherwise NumPy would silently broadcast a scalar slope.
+    func = as_function(function, ("x", "y"))
+    y0 = initial_state(y0)
+    if np.ndim(y0) and np.shape(func(x0, y0)) != y0.shape:
+        raise ValueError(f"La función debe devolver {y0.size} componentes, uno por cada valor de y0.")
+    return func, y0
+
+
+def max_norm(value):
+    return float(np.max(np.abs(value)))
+
+
+def _batch_grid(x0, y0, h, x_target):
+    # Broadcasts the initial conditions and step sizes of a batch to a common
+    # shape and computes how many steps each trajectory needs.
+    x0, y0, h, x_target = np.broadcast_arrays(
+        np.asarray(x0, dtype=float), np.asarray(y0, dtype=float),
+        np.asarray(h, dtype=float), np.asarray(x_target, dtype=float),
+    )
+    if np.any(h <= 0):
+        raise ValueError("El tamaño de paso debe ser mayor que cero.")
+
+    steps = np.rint((x_target - x0) / h).astype(np.int64)
+    if np.any(steps < 0):
+        raise ValueError("xf debe ser mayor o igual que x0.")
+    return x0.copy(), y0.copy(), h, steps
+
+
+def _run_batch(step, function, x0, y0, h, x_target, store_trajectory, progress=None):
+    # Advances every trajectory of the batch at once. When all trajectories
+    # need the same number of steps no masking is required; otherwise the
+    # finished ones are frozen while the rest keep going.
+    func = as_function(function, ("x", "y"))
+    x0, y, h, steps = _batch_grid(x0, y0, h, x_target)
+    x = x0
+    total = int(steps.max()) if steps.size else 0
+    uniform = steps.size == 0 or bool(np.all(steps == total))
+
+    trajectory = None
+    if store_trajectory:
+        trajectory = np.full((total + 1,) + y.shape, np.nan)
+        trajectory[0] = y
+
+    for i in range(total):
+        if progress is not None and i % PROGRESS_INTERVAL == 0:
+            progress(i, total)
+        y_new = step(func, x, y, h)
+        # On the grid x0 + n*h of the single-trajectory engines, without drift.
+        if uniform:
+            x = x0 + (i + 1) * h
+            y = y_new
+        else:
+            active = i < steps
+            x = np.where(active, x0 + (i + 1) * h, x)
+            y = np.where(active, y_new, y)
+        if trajectory is not None:
+            trajectory[i + 1] = np.where(i < steps, y, np.nan)
+
+    return BatchResult(x, y, steps, trajectory)
+
+
+def _heun_step(func, x, y, h):
+    slope = func(x, y)
+    y_pred = y + h * slope
+    return y + (h / 2) * (slope + func(x + h, y_pred))
+
+
+def _rk4_step(func, x, y, h):
+    k1 = h * func(x, y)
+    k2 = h * func(x + h / 2, y + k1 / 2)
+    k3 = h * func(x + h / 2, y + k2 / 2)
+    k4 = h * func(x + h, y + k3)
+    return y + (k1 + 2 * k2 + 2 * k3 + k4) / 6
+
+
+def improved_euler_batch(function, x0, y0, h, x_target, store_trajectory=False, progress=None):
+    # Integrates many initial conditions of the same ODE with the improved
+    # Euler (Heun) method. x0, y0, h and x_target may be scalars or arrays
+    # and are broadcast against each other.
+    return _run_batch(_heun_step, function, x0, y0, h, x_target, store_trajectory, progress)
+
+
+def rk4_batch(function, x0, y0, h, x_target, store_trajectory=False, progress=None):
+    # Same as improved_euler_batch but with the classic fourth-order Runge-Kutta step.
+    return _run_batch(_rk4_step, function, x0, y0, h, x_target, store_trajectory, progress)
+
+
+class SolverResult:
+    # Array-backed table produced by the single-trajectory engines. Each column
+    # is a NumPy array keyed by the same names the GUI tables and JSON export use.
+    # "info" carries run statistics such as accepted and rejected steps.
+    # "checkpoint" is the state needed to continue the run (see continue_solve).
+    def __init__(self, columns, info=None, checkpoint=None):
+        self.columns = columns
+        self.info = info or {}
+        self.checkpoint = checkpoint
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def rows(self, precision=None):
+        # Yields one tuple per iteration, optionally rounded for display.
+        lists = [column.tolist() for column in self.columns.values()]
+        for row in zip(*lists):
+            yield format_row(row, precision)
+
+    def records(self, precision=None):
+        # Same rows as a list of dicts, the format of the "Copiar como JSON" export.
+        names = list(self.columns)
+        return [dict(zip(names, row)) for row in self.rows(precision)]
+
+    def append(self, other):
+        # New result with the rows of "other" after these ones; iterations are
+        # renumbered so they keep counting from the last row.
+        columns = {
+            name: np.arange(len(self) + len(other)) if name == "Iteración" else np.concatenate((column, other[name]))
+            for name, column in self.columns.items()
+        }
+        return SolverResult(columns, {**self.info, **other.info}, other.checkpoint)
+
+    def head(self, count):
+        # Result made of the first "count" rows. The columns are views, so this
+        # is cheap enough to hand out while an engine is still filling them.
+        return SolverResult({name: column[:count] for name, column in self.columns.items()}, self.info)
+
+    def tail(self, count):
+        # Result made of the last "count" rows, also as views.
+        start = max(0, len(self) - count)
+        return SolverResult({name: column[start:] for name, column in self.columns.items()}, self.info)
+
+
+def iteration_count(x0, h, x_target):
+    if h <= 0:
+        raise ValueError("El tamaño de paso debe ser mayor que cero.")
+    return int(round((x_target - x0) / h)) + 1
+
+
+def _stack(values, y):
+    # Column of per-step values; keeps the (0, n) shape of systems when empty.
+    return np.array(values, dtype=float).reshape((len(values),) + np.shape(y))
+
+
+def improved_euler_solve(function, x0, y0, h, x_target, progress=None, on_step=None):
+    # Improved Euler (Heun) method. Each row holds x, the current y, the
+    # corrected y of the next step and the predictor-corrector difference.
+    # For systems y_n and y_n+1 hold one vector per row and Error is the
+    # largest difference among the components.
+    func, y0 = ode_setup(function, y0, x0)
+    return _improved_euler_rows(func, x0, h, y0, 0, iteration_count(x0, h, x_target), progress, on_step)
+
+
+def _improved_euler_rows(func, x0, h, y, first, stop, progress, on_step=None):
+    # Rows first..stop-1 of an improved Euler run on the grid x0 + n*h, where
+    # y is the value at row "first". The checkpoint holds the y of row "stop".
+    count = max(0, stop - first)
+    norm = abs if np.ndim(y) == 0 else max_norm
+
+    result = SolverResult({
+        "Iteración": np.arange(first, first + count),
+        "x": np.empty(count),
+        "y_n": np.empty((count,) + np.shape(y)),
+        "y_n+1": np.empty((count,) + np.shape(y)),
+        "Error": np.empty(count),
+    })
+    xs, ys, y_next, errors = result["x"], result["y_n"], result["y_n+1"], result["Error"]
+
+    x = x0 + first * h
+    for i in range(count):
+        if progress is not None and i % PROGRESS_INTERVAL == 0:
+            progress(i, count, result.head(i))
+
+        # The slope at (x, y) is shared by the predictor and the corrector.
+        slope = func(x, y)
+        y_pred = y + h * slope
+        y_corr = y + (h / 2) * (slope + func(x + h, y_pred))
+
+        xs[i], ys[i], y_next[i], errors[i] = x, y, y_corr, norm(y_corr - y_pred)
+
+        y = y_corr
+        # Computed from x0 instead of accumulated, so x does not drift over long runs.
+        x = x0 + (first + i + 1) * h
+        if on_step is not None:
+            on_step(x, y)
+
+    result.checkpoint = {"method": "improved_euler", "x0": x0, "h": h, "row": first + count, "y": y}
+    return result
+
+
+def improved_euler_adaptive_solve(function, x0, y0, x_target, tol=1e-6, h0=None, max_steps=1_000_000, progress=None,
+                                  on_step=None):
+    # Improved Euler with automatic step control. The predictor-corrector
+    # difference |y_corr - y_pred| estimates the local error of the step, so h
+    # grows on flat stretches and shrinks where it exceeds the tolerance.
+    func, y0 = ode_setup(function, y0, x0)
+    if tol <= 0:
+        raise ValueError("La tolerancia debe ser mayor que cero.")
+    if x_target < x0:
+        raise ValueError("xf debe ser mayor o igual que x0.")
+
+    state = {
+        "method": "improved_euler_adaptive", "x": x0, "y": y0, "slope": func(x0, y0), "h": h0,
+        "accepted_steps": 0, "rejected_steps": 0, "evaluations": 1, "tol": tol, "max_steps": max_steps,
+    }
+    return _improved_euler_adaptive_run(func, state, x_target, progress, on_step)
+
+
+def _improved_euler_adaptive_run(func, state, x_target, progress, on_step=None):
+    # Integrates from a checkpoint state (x, y, the slope there, the proposed
+    # step size and the step counters) to x_target. Returns the accepted steps
+    # as rows, with the state at x_target as the new checkpoint.
+    SAFETY, FAC_MIN, FAC_MAX = 0.9, 0.2, 5.0
+
+    tol, max_steps = state["tol"], state["max_steps"]
+    x, y, slope, h = state["x"], state["y"], state["slope"], state["h"]
+    accepted, rejected, evaluations = state["accepted_steps"], state["rejected_steps"], state["evaluations"]
+    norm = abs if np.ndim(y) == 0 else max_norm
+    if x < x_target and (h is None or h <= 0):
+        h = (x_target - x) / 100
+
+    x_start, first = x, accepted
+    xs, ys, y_next, errors, hs = [], [], [], [], []
+    while x < x_target:
+        if accepted + rejected >= max_steps:
+            raise RuntimeError(f"Se alcanzó el máximo de {max_steps} pasos antes de llegar a xf.")
+        if progress is not None and (accepted + rejected) % PROGRESS_INTERVAL == 0:
+            progress(x - x_start, x_target - x_start)
+        step = min(h, x_target - x)
+
+        y_pred = y + step * slope
+        y_corr = y + (step / 2) * (slope + func(x + step, y_pred))
+        evaluations += 1
+        error = norm(y_corr - y_pred)
+
+        if error <= tol:
+            xs.append(x)
+            ys.append(y)
+            y_next.append(y_corr)
+            errors.append(error)
+            hs.append(step)
+            accepted += 1
+
+            x = x_target if x_target - (x + step) <= 1e-12 * abs(x_target) else x + step
+            y = y_corr
+            slope = func(x, y)
+            evaluations += 1
+            if on_step is not None:
+                on_step(x, y)
+        else:
+            rejected += 1
+
+        # The estimate is O(h^2), hence the square root in the update factor.
+        # A step only shortened to land on x_target keeps the proposed h for a later continuation.
+        if step == h or error > tol:
+            factor = FAC_MAX if error == 0 else SAFETY * (tol / error) ** 0.5
+            h = step * min(FAC_MAX, max(FAC_MIN, factor))
+
+    result = SolverResult(
+        {
+            "Iteración": np.arange(first, first + len(xs)),
+            "x": np.array(xs, dtype=float),
+            "y_n": _stack(ys, y),
+            "y_n+1": _stack(y_next, y),
+            "Error": np.array(errors, dtype=float),
+            "h": np.array(hs, dtype=float),
+        },
+        info={"accepted_steps": accepted, "rejected_steps": rejected, "evaluations": evaluations},
+    )
+    result.checkpoint = {
+        **state, "x": x, "y": y, "slope": slope, "h": h,
+        "accepted_steps": accepted, "rejected_steps": rejected, "evaluations": evaluations,
+    }
+    return result
+
+def rk4_solve(function, x0, y0, h, x_target, progress=None, on_step=None):
+    # Classic fourth-order Runge-Kutta method. Each row holds x and y before the
+    # step; for systems y is a vector and the stages are vector operations.
+    func, y0 = ode_setup(function, y0, x0)
+    return _rk4_rows(func, x0, h, y0, 0, iteration_count(x0, h, x_target), progress, on_step)
+
+
+def _rk4_rows(func, x0, h, y, first, stop, progress, on_step=None):
+    # Rows first..stop-1 of an RK4 run on the grid x0 + n*h, where y is the
+    # value at row "first". The checkpoint holds the last row.
+    count = max(0, stop - first)
+
+    result = SolverResult({
+        "Iteración": np.arange(first, first + count),
+        "x": np.empty(count),
+        "y": np.empty((count,) + np.shape(y)),
+    })
+    xs, ys = result["x"], result["y"]
+
+    x = x0 + first * h
+    for i in range(count):
+        if progress is not None and i % PROGRESS_INTERVAL == 0:
+            progress(i, count, result.head(i))
+
+        xs[i], ys[i] = x, y
+        if i == count - 1:
+            break
+
+        k1 = h * func(x, y)
+        k2 = h * func(x + h / 2, y + k1 / 2)
+        k3 = h * func(x + h / 2, y + k2 / 2)
+        k4 = h * func(x + h, y + k3)
+        # A new array each step: on_step callbacks and checkpoints may keep the previous state.
+        y = y + (k1 + 2 * k2 + 2 * k3 + k4) / 6
+        x = x0 + (first + i + 1) * h
+        if on_step is not None:
+            on_step(x, y)
+
+    result.checkpoint = {"method": "rk4", "x0": x0, "h": h, "row": first + count - 1, "y": y}
+    return result
+
+
+def continue_solve(function, checkpoint, x_target, progress=None, on_step=None):
+    # Continues a run from its checkpoint (result.checkpoint) up to a larger
+    # x_target and returns only the new rows, numbered after the previous
+    # ones and with their own checkpoint. "function" must be the f of the
+    # original run. Fixed-step runs stay on the original grid x0 + n*h and
+    # adaptive ones keep their step size and counters, so nothing before the
+    # checkpoint is recomputed.
+    func = as_function(function, ("x", "y"))
+    method = checkpoint["method"]
+    y = initial_state(checkpoint["y"])
+
+    if method == "improved_euler":
+        x0, h = checkpoint["x0"], checkpoint["h"]
+        return _improved_euler_rows(func, x0, h, y, checkpoint["row"], iteration_count(x0, h, x_target), progress, on_step)
+    if method == "rk4":
+        # RK rows hold y before each step, so the checkpoint row is computed again and dropped.
+        # The partial results handed to progress drop it too, so they hold the same rows as the returned ones.
+        x0, h = checkpoint["x0"], checkpoint["h"]
+        report = progress
+        if progress is not None:
+            def report(done, total, partial=None):
+                progress(done, total, None if partial is None else partial.tail(len(partial) - 1))
+        rows = _rk4_rows(func, x0, h, y, checkpoint["row"], iteration_count(x0, h, x_target), report, on_step)
+        new_rows = rows.tail(len(rows) - 1)
+        new_rows.checkpoint = rows.checkpoint
+        return new_rows
+    if method == "improved_euler_adaptive":
+        state = dict(checkpoint, y=y, slope=initial_state(checkpoint["slope"]))
+        return _improved_euler_adaptive_run(func, state, x_target, progress, on_step)
+    if method == "rk45":
+        state = dict(checkpoint, y=y, k1=initial_state(checkpoint["k1"]))
+        return _rk45_run(func, state, x_target, progress, on_step)
+    raise ValueError(f"No se puede continuar un cálculo de tipo {method}.")
+
+
+def extend_solve(result, function, x_target, progress=None, on_step=None):
+    # The rows of "result" followed by those of its continuation up to x_target.
+    if result.checkpoint is None:
+        raise ValueError("El resultado no tiene un punto de control para continuar.")
+    return result.append(continue_solve(function, result.checkpoint, x_target, progress, on_step))
+
+
+def evaluation_points(text):
+    # Parses the x values requested from a dense run: "" for none, a list such
+    # as "0.5, 1.25, 3", or "inicio:fin:paso" for evenly spaced points.
+    text = text.strip()
+    if not text:
+        return None
+    if ":" in text:
+        start, stop, step = (float(part) for part in text.split(":"))
+        if step <= 0 or stop < start:
+            raise ValueError("Los puntos deben escribirse como inicio:fin:paso, con paso > 0 y fin >= inicio.")
+        return np.linspace(start, stop, int(round((stop - start) / step)) + 1)
+    return np.array([float(part) for part in text.split(",")])
+
+
+def _hermite(theta, h, y0, f0, y1, f1):
+    # Cubic Hermite interpolant on one step, matching y and y' at both ends.
+    # theta = (x - x_n) / h in [0, 1], one value per requested point.
+    theta = theta.reshape(theta.shape + (1,) * np.ndim(y0))
+    return ((1 + 2 * theta) * (1 - theta) ** 2 * y0 + theta * (1 - theta) ** 2 * h * f0
+            + theta ** 2 * (3 - 2 * theta) * y1 + theta ** 2 * (theta - 1) * h * f1)
+
+
+def _heun_from_slope(func, x, y, h, slope):
+    return y + (h / 2) * (slope + func(x + h, y + h * slope)), 1
+
+
+def _rk4_from_slope(func, x, y, h, slope):
+    k1 = h * slope
+    k2 = h * func(x + h / 2, y + k1 / 2)
+    k3 = h * func(x + h / 2, y + k2 / 2)
+    k4 = h * func(x + h, y + k3)
+    return y + (k1 + 2 * k2 + 2 * k3 + k4) / 6, 3
+
+
+def _dense_solve(step, function, x0, y0, h, x_eval, progress, on_step=None):
+    # Integrates on the fixed grid x0 + n*h up to the last requested point and
+    # keeps only the interpolated values at x_eval, so memory depends on the
+    # number of points and not on the number of steps. The slope at the end
+    # of a step is the first stage of the next one, so the interpolant costs
+    # no extra evaluations.
+    func, y0 = ode_setup(function, y0, x0)
+    if h <= 0:
+        raise ValueError("El tamaño de paso debe ser mayor que cero.")
+    x_eval = np.sort(np.asarray(x_eval, dtype=float).ravel())
+    if x_eval.size and x_eval[0] < x0:
+        raise ValueError("Los puntos de evaluación deben ser mayores o iguales que x0.")
+
+    points = len(x_eval)
+    steps = int(np.ceil((x_eval[-1] - x0) / h - 1e-9)) if points else 0
+    # The tolerance keeps a point on a grid node from costing an extra step;
+    # a point just past the last node still needs that step.
+    while points and x0 + steps * h < x_eval[-1]:
+        steps += 1
+    # NaN until filled, so a point the loop missed can never pass for a value.
+    result = SolverResult({"Iteración": np.arange(points), "x": x_eval, "y": np.full((points,) + np.shape(y0), np.nan)})
+    ys = result["y"]
+    next_point = x_eval.tolist() + [np.inf]
+
+    x, y = x0, y0
+    slope = func(x, y)
+    evaluations = 1
+    done = 0
+    # Points exactly at x0 need no step at all.
+    while next_point[done] <= x0:
+        ys[done] = y0
+        done += 1
+
+    for i in range(steps):
+        if progress is not None and i % PROGRESS_INTERVAL == 0:
+            progress(i, steps, result.head(done))
+
+        y_new, stage_evaluations = step(func, x, y, h, slope)
+        x_new = x0 + (i + 1) * h
+        slope_new = func(x_new, y_new)
+        evaluations += stage_evaluations + 1
+
+        if next_point[done] <= x_new:
+            end = int(np.searchsorted(x_eval, x_new, side="right"))
+            ys[done:end] = _hermite((x_eval[done:end] - x) / h, h, y, slope, y_new, slope_new)
+            done = end
+
+        x, y, slope = x_new, y_new, slope_new
+        if on_step is not None:
+            on_step(x, y)
+
+    result.info.update({"steps": steps, "evaluations": evaluations})
+    return result
+
+
+def improved_euler_dense_solve(function, x0, y0, h, x_eval, progress=None, on_step=None):
+    # Improved Euler on the grid x0 + n*h with dense output: returns y at the
+    # requested x values (any order, not necessarily on the grid) without
+    # storing the individual steps.
+    return _dense_solve(_heun_from_slope, function, x0, y0, h, x_eval, progress, on_step)
+
+
+def rk4_dense_solve(function, x0, y0, h, x_eval, progress=None, on_step=None):
+    # Same as improved_euler_dense_solve with the classic RK4 step. The cubic
+    # Hermite interpolant is fourth-order accurate, like the method itself.
+    return _dense_solve(_rk4_from_slope, function, x0, y0, h, x_eval, progress, on_step)
+
+
+def _value_and_slope(function, derivative):
+    # f(x), f'(x) of a root finder. Without an explicit derivative both come
+    # from one automatic-differentiation pass over f (see autodiff.py).
+    func = as_function(function, ("x",))
+    if derivative is None:
+        return lambda x: value_and_derivative(func, x)
+    dfunc = as_function(derivative, ("x",))
+    return lambda x: (func(x), dfunc(x))
+
+
+def newton_solve(function, derivative, x0, precision=None, max_iterations=100, xtol=None, rtol=0.0, ftol=None, progress=None,
+                 on_step=None):
+    # Newton-Raphson iteration. Stops when the step |Xn+1 - Xn| is within
+    # xtol + rtol * |Xn+1| (when only "precision" is given, xtol is half a unit
+    # of that decimal place), when |f(Xn)| <= ftol, when the derivative
+    # vanishes, when x diverges or after max_iterations. The reason is kept in
+    # result.info["reason"]. Values are never rounded here. With derivative
+    # None, f' is computed by automatic differentiation together with f.
+    evaluate = _value_and_slope(function, derivative)
+
+    MAX_LIMIT = 1e100  # Límite de valores permitidos para evitar errores
+
+    if xtol is None and precision is not None:
+        xtol = 0.5 * 10.0 ** -precision
+    elif xtol is None:
+        # Without a precision the iteration runs until x only moves by a few ulps.
+        xtol, rtol = 0.0, max(rtol, 4 * np.finfo(float).eps)
+
+    xs = []
+    x_next = []
+    fxs = []
+    x = x0
+    reason = "max_iterations"
+    while len(xs) < max_iterations:
+        if progress is not None and len(xs) % PROGRESS_INTERVAL == 0:
+            progress(len(xs), max_iterations)
+        try:
+            fx, dfx = evaluate(x)
+            if on_step is not None:
+                on_step(x, fx)
+            if ftol is not None and abs(fx) <= ftol:
+                reason = "converged"
+                break
+
+            if dfx == 0:
+                reason = "zero_derivative"
+                break
+
+            x_new = x - fx / dfx
+
+            if abs(x_new) > MAX_LIMIT:
+                reason = "diverged"
+                break
+
+            xs.append(x)
+            x_next.append(x_new)
+            fxs.append(fx)
+
+            # Condición de parada: el paso es menor que la tolerancia
+            if abs(x_new - x) <= xtol + rtol * abs(x_new):
+                reason = "converged"
+                break
+
+            x = x_new
+        except OverflowError:
+            reason = "overflow"
+            break
+
+    return SolverResult(
+        {
+            "Iteración": np.arange(len(xs)),
+            "x": np.array(xs, dtype=float),
+            "Xn+1": np.array(x_next, dtype=float),
+            "f(x)": np.array(fxs, dtype=float),
+        },
+        info={"reason": reason, "converged": reason == "converged", "root": float(x_next[-1]) if x_next else float(x)},
+    )
+
+
+def newton_multistart(function, derivative, a, b, starts=200, max_iterations=50, xtol=1e-12, ftol=1e-9, dedup_tol=1e-7, progress=None):
+    # Finds the distinct roots of f in [a, b] by running Newton from a grid of
+    # starting points at once. Every start is an element of one NumPy array, so
+    # the whole grid costs a handful of vectorized evaluations per iteration.
+    # As in newton_solve, derivative None uses automatic differentiation.
+    evaluate = _value_and_slope(function, derivative)
+    if b <= a:
+        raise ValueError("El intervalo debe cumplir a < b.")
+
+    x = np.linspace(a, b, starts)
+    active = np.ones(starts, dtype=bool)
+
+    with np.errstate(all="ignore"):
+        for i in range(max_iterations):
+            if progress is not None:
+                progress(i, max_iterations)
+            if not active.any():
+                break
+            xa = x[active]
+            fx, dfx = (np.broadcast_to(value, xa.shape) for value in evaluate(xa))
+            step = np.where(dfx != 0, fx / dfx, np.nan)
+            x_new = xa - step
+
+            x[active] = x_new
+            # Starts that converged, hit a zero derivative or blew up stop iterating.
+            done = ~np.isfinite(x_new) | (np.abs(step) <= xtol * np.maximum(1.0, np.abs(x_new)))
+            active[np.flatnonzero(active)[done]] = False
+
+        fx = np.broadcast_to(evaluate(x)[0], x.shape)
+        found = np.isfinite(x) & (np.abs(fx) <= ftol) & (x >= a - dedup_tol) & (x <= b + dedup_tol)
+
+    roots = np.sort(x[found])
+    if roots.size == 0:
+        return roots
+    # Starts that converged to the same root differ only by round-off.
+    keep = np.concatenate(([True], np.diff(roots) > dedup_tol * np.maximum(1.0, np.abs(roots[1:]))))
+    return roots[keep]
+
+
+# Dormand-Prince 5(4) tableau. The last stage is evaluated at the new point,
+# so it is reused as the first stage of the next step (FSAL).
+_DP_C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# Difference between the fifth- and fourth-order weights, used for the error estimate.
+_DP_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def _error_norm(error, y, y_new, rtol, atol):
+    scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+    return float(np.sqrt(np.mean(np.square(error / scale))))
+
+
+def _initial_step(func, x0, y0, f0, x_target, order, rtol, atol):
+    # Starting step heuristic from Hairer, Norsett and Wanner.
+    scale = atol + rtol * np.abs(y0)
+    d0 = float(np.sqrt(np.mean(np.square(y0 / scale))))
+    d1 = float(np.sqrt(np.mean(np.square(f0 / scale))))
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    h0 = min(h0, x_target - x0)
+
+    f1 = func(x0 + h0, y0 + h0 * f0)
+    d2 = float(np.sqrt(np.mean(np.square((f1 - f0) / scale)))) / h0
+    if max(d1, d2) <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / (order + 1))
+    return min(100 * h0, h1, x_target - x0)
+
+
+def rk45_solve(function, x0, y0, x_target, rtol=1e-6, atol=1e-9, h0=None, max_steps=1_000_000, progress=None,
+               on_step=None):
+    # Adaptive Dormand-Prince 5(4) method. The step size is chosen so that the
+    # local error estimate stays within atol + rtol * |y|; each row is an
+    # accepted step and "h" is the step that led to it.
+    func, y0 = ode_setup(function, y0, x0)
+    if rtol <= 0 and atol <= 0:
+        raise ValueError("Las tolerancias deben ser mayores que cero.")
+    if x_target < x0:
+        raise ValueError("xf debe ser mayor o igual que x0.")
+
+    state = {
+        "method": "rk45", "x": x0, "y": y0, "k1": func(x0, y0), "h": h0,
+        "accepted_steps": 0, "rejected_steps": 0, "evaluations": 1,
+        "rtol": rtol, "atol": atol, "max_steps": max_steps,
+    }
+    return _rk45_run(func, state, x_target, progress, on_step, include_start=True)
+
+
+def _rk45_run(func, state, x_target, progress, on_step=None, include_start=False):
+    # Integrates from a checkpoint state (x, y, the first stage k1 = f(x, y)
+    # reused through FSAL, the proposed step size and the step counters) to
+    # x_target. A new run also lists its starting point as a row with h = 0.
+    SAFETY, FAC_MIN, FAC_MAX = 0.9, 0.2, 5.0
+
+    rtol, atol, max_steps = state["rtol"], state["atol"], state["max_steps"]
+    x, y, k1, h = state["x"], state["y"], state["k1"], state["h"]
+    accepted, rejected, evaluations = state["accepted_steps"], state["rejected_steps"], state["evaluations"]
+    if x < x_target and (h is None or h <= 0):
+        h = _initial_step(func, x, y, k1, x_target, 5, rtol, atol)
+        evaluations += 1
+
+    x_start, first = x, accepted + (0 if include_start else 1)
+    xs, ys, hs = ([x], [y], [0.0]) if include_start else ([], [], [])
+    while x < x_target:
+        if accepted + rejected >= max_steps:
+            raise RuntimeError(f"Se alcanzó el máximo de {max_steps} pasos antes de llegar a xf.")
+        if progress is not None and (accepted + rejected) % PROGRESS_INTERVAL == 0:
+            progress(x - x_start, x_target - x_start)
+        step = min(h, x_target - x)
+
+        k = [k1]
+        for stage in range(1, 7):
+            y_stage = y + step * sum(a * k_j for a, k_j in zip(_DP_A[stage], k))
+            k.append(func(x + _DP_C[stage] * step, y_stage))
+        evaluations += 6
+
+        y_new = y + step * sum(b * k_j for b, k_j in zip(_DP_A[6], k))
+        error = step * sum(e * k_j for e, k_j in zip(_DP_E, k))
+        err = _error_norm(error, y, y_new, rtol, atol)
+
+        if err <= 1.0:
+            x = x_target if x_target - (x + step) <= 1e-12 * abs(x_target) else x + step
+            y = y_new
+            k1 = k[6]
+            accepted += 1
+            xs.append(x)
+            ys.append(y)
+            hs.append(step)
+            if on_step is not None:
+                on_step(x, y)
+            factor = FAC_MAX if err == 0 else min(FAC_MAX, SAFETY * err ** -0.2)
+        else:
+            rejected += 1
+            factor = max(FAC_MIN, SAFETY * err ** -0.2)
+
+        # A step only shortened to land on x_target keeps the proposed h for a later continuation.
+        if step == h or err > 1.0:
+            h = step * factor
+
+    result = SolverResult(
+        {"Iteración": np.arange(first, first + len(xs)), "x": np.array(xs, dtype=float), "y": _stack(ys, y), "h": np.array(hs)},
+        info={"accepted_steps": accepted, "rejected_steps": rejected, "evaluations": evaluations},
+    )
+    result.checkpoint = {
+        **state, "x": x, "y": y, "k1": k1, "h": h,
+        "accepted_steps": accepted, "rejected_steps": rejected, "evaluations": evaluations,
+    }
+    return result
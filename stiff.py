@@ -0,0 +1,221 @@
+import inspect
+import numpy as np
+from solvers import PROGRESS_INTERVAL, SolverResult, as_function, iteration_count, max_norm, ode_setup
+
+# Implicit methods for stiff ODEs, where the explicit engines are only stable
+# with a tiny h. Every step solves z = base + gamma * h * f(x_next, z) for the
+# new y with Newton's method, like newton_solve does for f(x) = 0, using the
+# Jacobian df/dy from symbolic.jacobian. The Jacobian and the inverse of the
+# iteration matrix I - gamma*h*J are kept from step to step and only
+# recomputed when the iteration stops converging quickly, so most steps cost
+# a couple of evaluations of f and no new Jacobian.
+
+# Newton iterations allowed per step before the Jacobian is considered stale.
+NEWTON_MAX_ITERATIONS = 7
+
+# A Newton correction at or below this (relative to |y|) ends the iteration.
+NEWTON_TOL = 1e-10
+
+
+def numerical_jacobian(func, x, y):
+    # Forward-difference Jacobian, used when f cannot be differentiated
+    # symbolically (a plain callable or an expression SymPy does not know).
+    f0 = func(x, y)
+    if np.ndim(y) == 0:
+        delta = np.sqrt(np.finfo(float).eps) * max(1.0, abs(y))
+        return (func(x, y + delta) - f0) / delta
+
+    jacobian = np.empty((y.size, y.size))
+    for k in range(y.size):
+        shifted = y.copy()
+        delta = np.sqrt(np.finfo(float).eps) * max(1.0, abs(y[k]))
+        shifted[k] += delta
+        jacobian[:, k] = (func(x, shifted) - f0) / delta
+    return jacobian
+
+
+def _jacobian_function(function, x0, y0, jacobian):
+    # The Jacobian given by the caller, the symbolic one of an expression (also
+    # behind reduce_order and profiling wrappers), or None for finite differences.
+    if jacobian is not None:
+        return as_function(jacobian, ("x", "y"))
+
+    from symbolic import jacobian as symbolic_jacobian
+
+    source = inspect.unwrap(function)
+    try:
+        if isinstance(source, str):
+            derivative = symbolic_jacobian(source, y0.size if np.ndim(y0) else None)[1]
+        elif getattr(source, "expression", None) is not None:
+            derivative = symbolic_jacobian(source.expression, source.order, higher_order=True)[1]
+        else:
+            return None
+        # Some derivatives only fail once evaluated (e.g. the DiracDelta of sign), so
+        # the Jacobian is tried at the initial point before it is trusted.
+        if np.all(np.isfinite(np.asarray(derivative(x0, y0), dtype=float))):
+            return derivative
+    except Exception:
+        # Anything SymPy cannot parse, differentiate or print falls back to finite differences.
+        pass
+    return None
+
+
+class _NewtonIteration:
+    # Solves the implicit equation of each step, keeping the Jacobian and the
+    # inverse iteration matrix between steps. Counts what every part costs.
+    def __init__(self, func, jacobian, h, tol):
+        self.func = func
+        self.jacobian = jacobian
+        self.h = h
+        self.tol = tol
+        self.norm = None
+        self.inverse = None
+        self.gamma = None
+        self.fresh = False
+        self.evaluations = 0
+        self.jacobian_evaluations = 0
+        self.factorizations = 0
+        self.iterations = 0
+
+    def solve(self, x, base, gamma, z):
+        # z = base + gamma*h*f(x, z), starting from the guess z. A step that
+        # fails with an old Jacobian is retried with a fresh one, and then
+        # with full Newton, which recomputes it on every iteration.
+        if self.norm is None:
+            self.norm = abs if np.ndim(z) == 0 else max_norm
+        while True:
+            if self.inverse is None or gamma != self.gamma:
+                self._factor(x, z, gamma)
+            result = self._iterate(x, base, z)
+            if result is not None:
+                self.fresh = False
+                return result
+            if self.fresh:
+                break
+            self.inverse = None
+
+        result = self._iterate(x, base, z, full=True)
+        if result is None:
+            raise RuntimeError(f"El método de Newton no convergió en x = {x}; prueba con un h menor.")
+        self.fresh = False
+        return result
+
+    def _factor(self, x, z, gamma):
+        if self.jacobian is None:
+            jacobian = numerical_jacobian(self.func, x, z)
+            self.evaluations += np.size(z) + 1
+        else:
+            jacobian = self.jacobian(x, z)
+        self.jacobian_evaluations += 1
+
+        try:
+            if np.ndim(z) == 0:
+                self.inverse = 1.0 / (1.0 - gamma * self.h * float(jacobian))
+            else:
+                matrix = np.eye(z.size) - gamma * self.h * np.asarray(jacobian, dtype=float)
+                self.inverse = np.linalg.inv(matrix)
+        except (ZeroDivisionError, np.linalg.LinAlgError):
+            raise ValueError(f"La matriz de iteración es singular en x = {x}; prueba con otro h.") from None
+        self.factorizations += 1
+        self.gamma = gamma
+        self.fresh = True
+
+    def _iterate(self, x, base, z, full=False):
+        # Simplified Newton: every correction uses the same inverse. Returns
+        # None when it does not converge or the corrections stop shrinking fast.
+        previous = None
+        for _ in range(NEWTON_MAX_ITERATIONS if not full else 4 * NEWTON_MAX_ITERATIONS):
+            if full:
+                self._factor(x, z, self.gamma)
+            residual = z - base - self.gamma * self.h * self.func(x, z)
+            self.evaluations += 1
+            self.iterations += 1
+            correction = self.inverse * residual if np.ndim(z) == 0 else self.inverse @ residual
+            z = z - correction
+
+            size = self.norm(correction)
+            if not np.isfinite(size):
+                return None
+            if size <= self.tol * (1.0 + self.norm(z)):
+                return z
+            if previous is not None and size > 0.5 * previous and not full:
+                return None
+            previous = size
+        return None
+
+
+def _implicit_solve(method, function, x0, y0, h, x_target, jacobian, tol, progress, on_step):
+    # Fixed-step implicit run on the grid x0 + n*h. Rows hold x and y at every
+    # grid point, like rk4_solve.
+    func, y0 = ode_setup(function, y0, x0)
+    newton = _NewtonIteration(func, _jacobian_function(function, x0, y0, jacobian), h, tol)
+    iterations = iteration_count(x0, h, x_target)
+
+    result = SolverResult({
+        "Iteración": np.arange(iterations),
+        "x": np.empty(iterations),
+        "y": np.empty((iterations,) + np.shape(y0)),
+    })
+    xs, ys = result["x"], result["y"]
+
+    x, y, y_previous = x0, y0, None
+    if method == "trapezoidal":
+        slope = func(x0, y0)
+        newton.evaluations += 1
+    for i in range(iterations):
+        if progress is not None and i % PROGRESS_INTERVAL == 0:
+            progress(i, iterations, result.head(i))
+
+        xs[i], ys[i] = x, y
+        if i == iterations - 1:
+            break
+
+        if method == "trapezoidal":
+            base, gamma = y + (h / 2) * slope, 0.5
+        elif method == "bdf2" and y_previous is not None:
+            base, gamma = (4 * y - y_previous) / 3, 2 / 3
+        else:
+            # Backward Euler, also the first step of BDF2.
+            base, gamma = y, 1.0
+
+        x_next = x0 + (i + 1) * h
+        y_next = newton.solve(x_next, base, gamma, y)
+        if method == "trapezoidal":
+            # f at the new point follows from the equation just solved, without evaluating it.
+            slope = (y_next - base) / (gamma * h)
+        x, y, y_previous = x_next, y_next, y
+        if on_step is not None:
+            on_step(x, y)
+
+    result.info.update({
+        "evaluations": newton.evaluations,
+        "jacobian_evaluations": newton.jacobian_evaluations,
+        "factorizations": newton.factorizations,
+        "newton_iterations": newton.iterations,
+    })
+    return result
+
+
+def backward_euler_solve(function, x0, y0, h, x_target, jacobian=None, tol=NEWTON_TOL, progress=None, on_step=None):
+    # Backward (implicit) Euler: y_n+1 = y_n + h*f(x_n+1, y_n+1). First order
+    # and L-stable, so fast transients are damped for any h. "jacobian" is an
+    # optional df/dy (expression or callable); by default it is derived
+    # symbolically from f.
+    return _implicit_solve("backward_euler", function, x0, y0, h, x_target, jacobian, tol, progress, on_step)
+
+
+def trapezoidal_solve(function, x0, y0, h, x_target, jacobian=None, tol=NEWTON_TOL, progress=None, on_step=None):
+    # Trapezoidal rule: y_n+1 = y_n + h/2*(f(x_n, y_n) + f(x_n+1, y_n+1)), the
+    # implicit counterpart of improved Euler. Second order and A-stable.
+    return _implicit_solve("trapezoidal", function, x0, y0, h, x_target, jacobian, tol, progress, on_step)
+
+
+def bdf2_solve(function, x0, y0, h, x_target, jacobian=None, tol=NEWTON_TOL, progress=None, on_step=None):
+    # Second-order backward differentiation formula:
+    # y_n+1 = (4*y_n - y_n-1)/3 + 2h/3*f(x_n+1, y_n+1), started with one
+    # backward Euler step. Second order and L-stable.
+    return _implicit_solve("bdf2", function, x0, y0, h, x_target, jacobian, tol, progress, on_step)
+
+
+# Solver of every implicit method, keyed by the "mode" the windows and batch jobs use.
+IMPLICIT_METHODS = {"backward_euler": backward_euler_solve, "trapezoidal": trapezoidal_solve, "bdf2": bdf2_solve}
@@ -0,0 +1,82 @@
+from functools import lru_cache
+from types import SimpleNamespace
+
+
+def normalize(text):
+    # Expressions that only differ in whitespace share one cache entry.
+    return "".join(text.split())
+
+
+def differentiate(function_str, variable="x"):
+    # Returns the derivative of a user expression as (text, function): the text
+    # for display and a lambdified NumPy function for the solvers. Results are
+    # cached, so retyping or re-running a known function is instant.
+    return _differentiate(normalize(function_str), variable)
+
+
+@lru_cache(maxsize=256)
+def _differentiate(text, variable):
+    # SymPy is imported here and not at module level because it is slow to load.
+    import sympy as sp
+
+    symbol = sp.symbols(variable)
+    expression = sp.sympify(text, locals=_sympy_locals(sp))
+    derivative = sp.diff(expression, symbol)
+    function = sp.lambdify(symbol, derivative, modules="numpy")
+    # Identifies the function for result_cache, which cannot key arbitrary callables.
+    function.cache_key = ("derivative", str(derivative))
+    return str(derivative), function
+
+
+def jacobian(function_str, size=None, higher_order=False):
+    # Returns the Jacobian df/dy of an ODE right-hand side as (text, function),
+    # with function(x, y) giving a float for a scalar equation (size None) and
+    # an (n, n) array for a system of "size" equations written with y[0],
+    # y[1], ... With higher_order the expression is the highest derivative in
+    # terms of y, dy, d2y, ... and the Jacobian is that of its reduction to a
+    # first-order system (see solvers.reduce_order).
+    return _jacobian(normalize(function_str), size, higher_order)
+
+
+@lru_cache(maxsize=256)
+def _jacobian(text, size, higher_order):
+    import sympy as sp
+    from solvers import derivative_names
+
+    # Real symbols, so abs(y) differentiates to sign(y) instead of re/im terms NumPy cannot evaluate.
+    x = sp.Symbol("x", real=True)
+    if size is None:
+        y = sp.Symbol("y", real=True)
+        derivative = sp.diff(sp.sympify(text, locals={**_sympy_locals(sp), "x": x, "y": y}), y)
+        function = sp.lambdify((x, y), derivative, modules="numpy")
+    else:
+        ys = sp.symbols(f"y0:{size}", real=True)
+        if higher_order:
+            highest = sp.sympify(text, locals={**_sympy_locals(sp), "x": x, **dict(zip(derivative_names(size), ys))})
+            system = list(ys[1:]) + [highest]
+        else:
+            # "y" is a list of symbols, so y[0], y[1] and y[-1] pick the components.
+            system = sp.sympify(text, locals={**_sympy_locals(sp), "x": x, "y": list(ys)})
+            if not isinstance(system, (list, tuple)) or len(system) != size:
+                raise ValueError(f"La función debe devolver {size} componentes, uno por cada valor de y0.")
+        derivative = sp.Matrix(system).jacobian(ys)
+        function = sp.lambdify((x, ys), derivative, modules="numpy")
+    function.cache_key = ("jacobian", str(derivative))
+    return str(derivative), function
+
+
+def _sympy_locals(sp):
+    # Lets "np.sin(x)" and friends, as written in the usage guide, be parsed
+    # by SymPy: "np" resolves to the matching symbolic functions. Covers every
+    # function expressions.NUMPY_ATTRIBUTES allows.
+    functions = {
+        "exp": sp.exp, "expm1": lambda v: sp.exp(v) - 1,
+        "log": sp.log, "log10": lambda v: sp.log(v, 10), "log2": lambda v: sp.log(v, 2), "log1p": lambda v: sp.log(1 + v),
+        "sqrt": sp.sqrt, "cbrt": lambda v: sp.real_root(v, 3), "abs": sp.Abs, "sign": sp.sign, "power": sp.Pow,
+        "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
+        "arcsin": sp.asin, "arccos": sp.acos, "arctan": sp.atan,
+        "sinh": sp.sinh, "cosh": sp.cosh, "tanh": sp.tanh,
+        "arcsinh": sp.asinh, "arccosh": sp.acosh, "arctanh": sp.atanh,
+        "pi": sp.pi, "e": sp.E,
+    }
+    return {"np": SimpleNamespace(**functions), **functions}
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from autodiff import value_and_derivative
+
+# Expression, f and f' written by hand.
+CASES = (
+    ("x**3 - 2*x + 1", lambda x: x ** 3 - 2 * x + 1, lambda x: 3 * x ** 2 - 2),
+    ("x**x", lambda x: x ** x, lambda x: x ** x * (np.log(x) + 1)),
+    ("2**x", lambda x: 2 ** x, lambda x: 2 ** x * np.log(2)),
+    ("x % 0.75", lambda x: x % 0.75, lambda x: np.ones_like(x)),
+    ("7 % x", lambda x: 7 % x, lambda x: -(7 // x)),
+    ("abs(x - 1.2)", lambda x: np.abs(x - 1.2), lambda x: np.sign(x - 1.2)),
+    ("exp(-x) * sin(3*x) / (1 + x**2)", lambda x: np.exp(-x) * np.sin(3 * x) / (1 + x ** 2),
+     lambda x: (np.exp(-x) * (3 * np.cos(3 * x) - np.sin(3 * x)) * (1 + x ** 2) - np.exp(-x) * np.sin(3 * x) * 2 * x)
+     / (1 + x ** 2) ** 2),
+    ("sqrt(x) + log(x) + np.log10(x) + np.cbrt(x)", lambda x: np.sqrt(x) + np.log(x) + np.log10(x) + np.cbrt(x),
+     lambda x: 0.5 / np.sqrt(x) + 1 / x + 1 / (x * np.log(10)) + 1 / (3 * np.cbrt(x) ** 2)),
+    ("np.tanh(x) + np.arctan(x) + np.power(x, 2.5)", lambda x: np.tanh(x) + np.arctan(x) + x ** 2.5,
+     lambda x: 1 / np.cosh(x) ** 2 + 1 / (1 + x * x) + 2.5 * x ** 1.5),
+    ("-x + pi", lambda x: -x + np.pi, lambda x: -np.ones_like(x)),
+)
+
+POINTS = np.array([0.3, 0.9, 1.7, 2.5, 4.1])
+
+
+@pytest.mark.parametrize("text, f, df", CASES, ids=[case[0] for case in CASES])
+def test_matches_analytic_derivative(text, f, df):
+    # An array of x values at once, and each value on its own as a float.
+    value, derivative = value_and_derivative(text, POINTS)
+    np.testing.assert_allclose(value, f(POINTS), rtol=1e-13)
+    np.testing.assert_allclose(derivative, df(POINTS), rtol=1e-12)
+    for x in POINTS:
+        value, derivative = value_and_derivative(text, x)
+        assert value == pytest.approx(f(x), rel=1e-13) and derivative == pytest.approx(df(x), rel=1e-12)
+
+
+def test_constant_expression_has_zero_derivative():
+    value, derivative = value_and_derivative("2 * pi", POINTS)
+    assert value == pytest.approx(2 * np.pi) and np.all(derivative == 0)
+
+
+def test_negative_base_with_integer_exponent():
+    # A constant exponent never takes log(x), so x**2 is differentiable for x < 0.
+    value, derivative = value_and_derivative("x**2", -3.0)
+    assert (value, derivative) == (9.0, -6.0)
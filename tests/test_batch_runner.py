@@ -0,0 +1,42 @@
+import io
+import json
+from batch_runner import run_job, run_jobs
+from parallel import run_jobs_parallel
+
+
+def test_precision_zero_rounds_to_integers():
+    job = {"method": "runge_kutta", "function": "x + y", "x0": "0", "y0": "1", "step_size": "0.1", "target_x": "1"}
+    for precision, rounded in ((0, True), ("0", True), (None, False), ("", False)):
+        rows = io.StringIO()
+        summary = run_job(0, dict(job, precision=precision), rows)
+        assert summary["status"] == "ok"
+        values = [json.loads(line)["y"] for line in rows.getvalue().splitlines()]
+        assert all(value == round(value) for value in values) == rounded
+
+
+def test_parallel_output_matches_sequential():
+    jobs = [{"method": method, "function": "x + y", "x0": "0", "y0": "1", "step_size": "0.01", "target_x": str(k),
+             "precision": "6"} for k in range(1, 7) for method in ("runge_kutta", "improved_euler")]
+    sequential = io.StringIO()
+    run_jobs(jobs, sequential, sequential)
+    parallel = io.StringIO()
+    run_jobs_parallel(jobs, parallel, parallel, workers=2, chunksize=1)
+    assert parallel.getvalue() == sequential.getvalue()
+
+
+def test_newton_without_precision_iterates_to_full_precision():
+    for precision in (None, ""):
+        job = {"method": "newton_raphson", "function": "x**2 - 2", "x0": "1", "precision": precision}
+        rows = io.StringIO()
+        summary = run_job(0, job, rows)
+        root = json.loads(rows.getvalue().splitlines()[-1])["Xn+1"]
+        assert summary["status"] == "ok" and abs(root - 2 ** 0.5) < 1e-15
+
+
+def test_roots_job_finds_every_root_in_the_interval():
+    rows = io.StringIO()
+    job = {"method": "newton_raphson", "mode": "roots", "function": "np.sin(x)", "a": "-10", "b": "10"}
+    summary = run_job(0, job, rows)
+    roots = [json.loads(line)["Raíz"] for line in rows.getvalue().splitlines()]
+    assert summary["status"] == "ok" and summary["rows"] == 7
+    assert max(abs(root - k * 3.141592653589793) for root, k in zip(roots, range(-3, 4))) < 1e-9
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from expressions import compile_expression
+
+REJECTED = (
+    # Attributes other than np.<whitelisted>, and dunder access.
+    "np.os", "np.load('x')", "x.real", "np.sqrt.__call__(x)", "x.__class__", "().__class__.__bases__",
+    "np.__dict__", "__import__('os')", "__builtins__", "np", "abs(np)", "[np, x]",
+    # Comprehensions, lambdas and conditional expressions.
+    "[x for x in (1, 2)]", "sum(t for t in (x,))", "(lambda: 1)()", "x if x > 0 else -x", "x > 0", "x and 1",
+    # Calls on variables or on anything but a name or np.<function>, and keyword arguments.
+    "x(1)", "y[0](1)", "(x)(1)", "np.power(x, y=2)", "open('f')", "eval('1')",
+    # Non-numeric constants.
+    "'a'", "b'a'", "None", "True", "x + True", "...", "1j * x",
+    # Subscripts other than a variable with an integer index.
+    "y[0.5]", "y[True]", "y[x]", "y[0:1]", "y['a']", "np[0]", "(y)[1 + 0]",
+    # Nested lists, statements and empty text.
+    "[[x], y]", "x = 1", "", "   ", "x +",
+)
+
+
+@pytest.mark.parametrize("text", REJECTED)
+def test_rejects_anything_but_arithmetic(text):
+    with pytest.raises(ValueError):
+        compile_expression(text, ("x", "y"))
+
+
+def test_accepted_expressions_compute_their_values():
+    x, y = 0.7, 1.3
+    cases = {
+        "x + y * 2 - x / y": x + y * 2 - x / y,
+        "x ** 2 // 1 + y % 0.5": x ** 2 // 1 + y % 0.5,
+        "-x + +y": -x + y,
+        "sin(x) + cos(y) * tan(x)": np.sin(x) + np.cos(y) * np.tan(x),
+        "exp(x) * sqrt(y) + log(y) - abs(-x)": np.exp(x) * np.sqrt(y) + np.log(y) - x,
+        "pi * e": np.pi * np.e,
+        "np.log10(y) + np.cbrt(x) + np.arctan(x) + np.power(y, 3)": np.log10(y) + np.cbrt(x) + np.arctan(x) + y ** 3,
+        "np.sign(-x) * np.pi + np.expm1(x)": -np.pi + np.expm1(x),
+    }
+    for text, expected in cases.items():
+        assert compile_expression(text, ("x", "y"))(x, y) == pytest.approx(expected, rel=1e-15)
+
+
+def test_systems_and_components():
+    func = compile_expression("[y[1], -y[0] + x]", ("x", "y"))
+    np.testing.assert_array_equal(func(2.0, np.array([3.0, 4.0])), [4.0, -1.0])
+    assert compile_expression("y[-1]", ("x", "y"))(0, np.array([1.0, 5.0])) == 5.0
+
+
+def test_vectorized_over_arrays():
+    x = np.linspace(0, 1, 5)
+    np.testing.assert_allclose(compile_expression("x ** 2 + np.sin(x)", ("x",))(x), x ** 2 + np.sin(x))
@@ -0,0 +1,50 @@
+import numpy as np
+import result_cache
+from result_cache import ResultCache, solve_cached
+from solvers import continue_solve, improved_euler_solve, rk45_solve, rk4_solve
+
+
+def test_same_inputs_come_from_the_cache():
+    cache = ResultCache()
+    first = solve_cached(rk4_solve, "x + y", 0, 1, 0.1, 2, cache=cache)
+    assert solve_cached(rk4_solve, "x+y", 0.0, 1.0, 0.1, 2.0, cache=cache) is first
+    assert solve_cached(rk4_solve, "x + y", 0, 1, 0.05, 2, cache=cache) is not first
+
+
+def test_extended_run_equals_a_fresh_run(monkeypatch):
+    # A larger xf continues the cached run from its checkpoint.
+    extended_from = []
+    extend_solve = result_cache.extend_solve
+    monkeypatch.setattr(result_cache, "extend_solve", lambda result, *args: extended_from.append(result) or
+                        extend_solve(result, *args))
+    for solver, function, y0 in ((rk4_solve, "y", 1), (improved_euler_solve, "[y[1], -y[0]]", "1, 0")):
+        cache = ResultCache()
+        short = solve_cached(solver, function, 0, y0, 0.01, 2, cache=cache)
+        extended = solve_cached(solver, function, 0, y0, 0.01, 5, cache=cache)
+        assert extended_from[-1] is short
+        fresh = solver(function, 0, y0, 0.01, 5)
+        assert len(extended) == len(fresh) > len(short)
+        for name in fresh.columns:
+            np.testing.assert_allclose(extended[name], fresh[name], rtol=1e-13, atol=1e-15)
+        assert extended.checkpoint["row"] == fresh.checkpoint["row"]
+        np.testing.assert_allclose(extended.checkpoint["y"], fresh.checkpoint["y"], rtol=1e-13)
+
+
+def test_adaptive_extension_keeps_its_accuracy():
+    cache = ResultCache()
+    solve_cached(rk45_solve, "[y[1], -y[0]]", 0, "1, 0", 3, cache=cache)
+    extended = solve_cached(rk45_solve, "[y[1], -y[0]]", 0, "1, 0", 8, cache=cache)
+    np.testing.assert_array_equal(extended["Iteración"], np.arange(len(extended)))
+    assert np.all(np.diff(extended["x"]) > 0) and extended["x"][-1] == 8
+    np.testing.assert_allclose(extended["y"][-1], [np.cos(8), -np.sin(8)], atol=1e-5)
+
+
+def test_results_on_disk_survive_a_new_cache_and_can_be_continued(tmp_path):
+    first = solve_cached(rk4_solve, "y", 0, 1, 0.01, 2, cache=ResultCache(directory=str(tmp_path)))
+    reloaded = ResultCache(directory=str(tmp_path))
+    again = solve_cached(rk4_solve, "y", 0, 1, 0.01, 2, cache=reloaded)
+    assert again is not first
+    for name in first.columns:
+        np.testing.assert_array_equal(again[name], first[name])
+    new_rows = continue_solve("y", again.checkpoint, 3)
+    np.testing.assert_allclose(new_rows["y"], rk4_solve("y", 0, 1, 0.01, 3)["y"][len(first):], rtol=1e-13)
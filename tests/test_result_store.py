@@ -0,0 +1,42 @@
+import numpy as np
+from result_store import HEADER_SIZE, ResultWriter, load_result, result_dtype, save_result
+from solvers import continue_solve, improved_euler_solve, rk4_solve
+
+
+def test_writer_round_trip_in_chunks(tmp_path):
+    # A system, so "y" is stored as a subarray field, written a chunk at a time.
+    result = improved_euler_solve("[y[1], -y[0]]", 0, "1, 0", 0.01, 10)
+    path = str(tmp_path / "run.npy")
+    with ResultWriter(path, result_dtype(result)) as writer:
+        for start in range(0, len(result), 300):
+            writer.append(result.tail(len(result) - start).head(300))
+    assert writer.count == len(result)
+
+    for mmap in (True, False):
+        loaded = load_result(path, mmap=mmap)
+        assert list(loaded.columns) == list(result.columns)
+        for name in result.columns:
+            np.testing.assert_array_equal(loaded[name], result[name])
+    # The header keeps its reserved size, so the rows start right after it.
+    with open(path, "rb") as file:
+        assert file.read(HEADER_SIZE + 1)[HEADER_SIZE - 1:HEADER_SIZE] == b"\n"
+
+
+def test_empty_writer_gives_an_empty_result(tmp_path):
+    path = str(tmp_path / "empty.npy")
+    ResultWriter(path, result_dtype(rk4_solve("y", 0, 1, 0.1, 1))).close()
+    assert len(load_result(path)) == 0
+
+
+def test_npz_keeps_info_and_checkpoint(tmp_path):
+    result = rk4_solve("[y[1], -y[0]]", 0, "1, 0", 0.01, 2)
+    path = str(tmp_path / "run.npz")
+    save_result(path, result)
+    loaded = load_result(path)
+    assert loaded.info == result.info
+    for name in result.columns:
+        np.testing.assert_array_equal(loaded[name], result[name])
+    # The vector state of the checkpoint comes back as a list and still continues the run.
+    new_rows = continue_solve("[y[1], -y[0]]", loaded.checkpoint, 3)
+    np.testing.assert_allclose(new_rows["y"], rk4_solve("[y[1], -y[0]]", 0, "1, 0", 0.01, 3)["y"][len(result):],
+                               rtol=1e-13, atol=1e-15)
@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from parallel import run_task
+from service import SolverService, _batch_task, batch_key, check_job, expected_rows
+
+
+def test_check_job_rejects_wrong_field_types():
+    base = {"function": "y", "x0": "0", "y0": "1", "step_size": "0.1", "target_x": "1"}
+    check_job(base)
+    check_job(dict(base, x0=0, y0=[1, 0], points=[0.5], precision=None))
+    for field, value in (("function", 5), ("function", None), ("x0", [1]), ("step_size", True), ("y0", {"a": 1}),
+                         ("mode", 3), ("points", {"x": 1})):
+        with pytest.raises(ValueError):
+            check_job(dict(base, **{field: value}))
+
+
+def test_solve_reports_a_failure_as_an_error_summary():
+    class BrokenService(SolverService):
+        def __init__(self):
+            self.next_index = 0
+
+        async def _solve(self, index, job, send, summary_only):
+            raise BrokenProcessPool("A process in the process pool was terminated abruptly.")
+
+    async def send(text):
+        pass
+
+    summary = asyncio.run(BrokenService().solve({"method": "runge_kutta", "function": "y"}, send))
+    assert summary["status"] == "error" and summary["job"] == 0
+
+
+def test_batched_rows_equal_individual_runs():
+    jobs = [
+        {"function": "x*y - y**2", "x0": "0", "y0": "1", "step_size": "0.1", "target_x": "2", "precision": "6"},
+        {"function": "x * y - y ** 2", "x0": 0.5, "y0": 2, "step_size": 0.05, "target_x": 1.7},
+        {"function": "x*y-y**2", "x0": "-1", "y0": "0.3", "step_size": "0.2", "target_x": "3", "precision": 0},
+    ]
+    for method in ("runge_kutta", "improved_euler"):
+        keys = {batch_key(dict(job, method=method), method, expected_rows(job, method)) for job in jobs}
+        assert len(keys) == 1 and None not in keys
+        key = keys.pop()
+        entries = [(index, dict(job, method=method), False) for index, job in enumerate(jobs)]
+        batched = _batch_task(key[0], key[1], entries)
+        for (index, summary, rows), (_, job, _) in zip(batched, entries):
+            _, single_summary, single_rows = run_task((index, job, {}))
+            assert summary["info"] == {"batch_size": len(jobs)}
+            assert rows.splitlines() == single_rows.splitlines()
+            assert (summary["rows"], summary["last"]) == (single_summary["rows"], single_summary["last"])
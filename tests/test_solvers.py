@@ -0,0 +1,45 @@
+import numpy as np
+from solvers import continue_solve, improved_euler_dense_solve, improved_euler_solve, rk4_dense_solve, rk4_solve
+
+
+def test_dense_points_just_past_a_grid_node():
+    # Points a rounding error past the last node still get the step that reaches them.
+    for solve in (rk4_dense_solve, improved_euler_dense_solve):
+        result = solve("y", 0, 5, 0.1, [0.7, 0.7 + 1e-11, 1.00000000003])
+        assert np.all(np.isfinite(result["y"]))
+        np.testing.assert_allclose(result["y"], 5 * np.exp(result["x"]), rtol=1e-2)
+
+
+def test_dense_points_on_grid_nodes_take_no_extra_step():
+    result = rk4_dense_solve("y", 0, 1, 0.1, [0.5, 1.0])
+    assert result.info["steps"] == 10
+
+
+def test_on_step_receives_each_state_of_a_system():
+    # Callbacks that keep the states must not all end up with the final one.
+    for solve, column in ((rk4_solve, "y"), (improved_euler_solve, "y_n+1")):
+        states = []
+        result = solve("[y[1], -y[0]]", 0, "1, 0", 0.1, 1, on_step=lambda x, y: states.append(y))
+        expected = result[column][1:] if column == "y" else result[column]
+        np.testing.assert_array_equal(np.array(states), expected)
+
+
+def test_continuation_partials_start_after_the_previous_rows():
+    # The plot draws a continuation's partial results after the rows it already has.
+    for solve in (rk4_solve, improved_euler_solve):
+        result = solve("-y", 0, 1, 0.001, 3)
+        partials = []
+        new_rows = continue_solve("-y", result.checkpoint, 6, lambda done, total, partial=None: partials.append(partial))
+        assert new_rows["Iteración"][0] == len(result)
+        for partial in partials:
+            assert len(partial) == 0 or partial["Iteración"][0] == len(result)
+            np.testing.assert_array_equal(partial["x"], new_rows["x"][:len(partial)])
+
+
+def test_continue_solve_equals_a_fresh_run():
+    for solve in (rk4_solve, improved_euler_solve):
+        result = solve("-2*y + x", 0, 1, 0.001, 1)
+        new_rows = continue_solve("-2*y + x", result.checkpoint, 3)
+        fresh = solve("-2*y + x", 0, 1, 0.001, 3)
+        for name in fresh.columns:
+            np.testing.assert_allclose(new_rows[name], fresh[name][len(result):], rtol=1e-13, atol=1e-15)
@@ -0,0 +1,15 @@
+import numpy as np
+from stiff import backward_euler_solve, bdf2_solve
+
+
+def test_jacobian_falls_back_to_finite_differences():
+    # log10 is parsed by SymPy; sign differentiates to a DiracDelta NumPy cannot evaluate.
+    for function in ("-1000*(np.log10(y+10) - 1)", "-1000*(y - np.cos(x)) + 0*np.sign(y)"):
+        result = backward_euler_solve(function, 0, 0, 0.1, 2)
+        assert np.all(np.isfinite(result["y"]))
+
+
+def test_stiff_example_is_damped():
+    for solve in (backward_euler_solve, bdf2_solve):
+        result = solve("-1000*(y - np.cos(x))", 0, 0, 0.1, 2)
+        assert abs(result["y"][-1] - np.cos(2)) < 0.01
@@ -0,0 +1,195 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+from formatting import format_row
+
+VIEW_ALL = "Todas las filas"
+VIEW_EVERY_N = "Cada N filas"
+VIEW_SUMMARY = "Resumen"
+
+
+class VirtualTable(ttk.Frame):
+    # Results table that keeps the data in NumPy columns and only creates
+    # Treeview items for the rows currently on screen. Scrolling rewrites the
+    # values of those few items, so opening a run costs the same for 100 or
+    # 10^7 rows.
+    def __init__(self, master, columns, headings, visible_rows=15):
+        super().__init__(master, style="TFrame")
+
+        self.columns = columns
+        self.data = None
+        self.precision = None
+        self.indices = None
+        self.offset = 0
+        self.visible_rows = visible_rows
+        self.view = tk.StringVar(value=VIEW_ALL)
+        self.step = tk.StringVar(value="10")
+
+        self._create_interface(headings)
+
+    def _create_interface(self, headings):
+        # View selector: every row, every Nth row or a first/last/min/max summary.
+        view_frame = ttk.Frame(self, style="TFrame")
+        view_frame.pack(fill="x")
+        view_box = ttk.Combobox(view_frame, textvariable=self.view, state="readonly", width=16,
+                                values=(VIEW_ALL, VIEW_EVERY_N, VIEW_SUMMARY))
+        view_box.pack(side="left", padx=5)
+        view_box.bind("<<ComboboxSelected>>", lambda event: self._apply_view())
+        ttk.Label(view_frame, text="N:", font=("Arial", 12)).pack(side="left")
+        step_entry = ttk.Entry(view_frame, textvariable=self.step, width=8)
+        step_entry.pack(side="left", padx=5)
+        step_entry.bind("<Return>", lambda event: self._apply_view())
+        self.count_label = ttk.Label(view_frame, text="", font=("Arial", 12))
+        self.count_label.pack(side="right", padx=5)
+
+        table_frame = ttk.Frame(self, style="TFrame")
+        table_frame.pack(fill="both", expand=True)
+
+        self.tree = ttk.Treeview(table_frame, columns=self.columns, show="headings", height=self.visible_rows)
+        for column, heading in zip(self.columns, headings):
+            self.tree.heading(column, text=heading)
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-1, "pages"))
+        self.tree.bind("<Next>", lambda event: self.scroll(1, "pages"))
+        self.tree.bind("<Home>", lambda event: self._move_to(0))
+        self.tree.bind("<End>", lambda event: self._move_to(self.row_count()))
+
+    def set_data(self, data, precision=None):
+        # Shows a new result. "data" is a SolverResult or any mapping of column
+        # name to array; values are rounded to "precision" only when drawn.
+        self.data = data
+        self.precision = precision
+        self.offset = 0
+        self._apply_view()
+
+    def set_columns(self, columns, headings):
+        # Switches to another set of columns, e.g. when a window shows either
+        # every step of a run or only its evaluation points.
+        if tuple(columns) == tuple(self.columns):
+            return
+        self.clear()
+        self.columns = columns
+        self.tree.delete(*self.tree.get_children())
+        self.tree.config(columns=columns)
+        for column, heading in zip(columns, headings):
+            self.tree.heading(column, text=heading)
+
+    def update_data(self, data):
+        # Replaces the data of the current run (e.g. more rows computed by a
+        # running solver) without moving the scroll position or the view.
+        self.data = data
+        self._apply_view(keep_offset=True)
+
+    def set_precision(self, precision):
+        self.precision = precision
+        self._render()
+
+    def clear(self):
+        self.data = None
+        self.indices = None
+        self.offset = 0
+        self._render()
+
+    def row_count(self):
+        if self.data is None:
+            return 0
+        if self.indices is not None:
+            return len(self.indices)
+        return len(self.data[self.columns[0]])
+
+    def scroll(self, amount, unit):
+        page = self.visible_rows if unit == "pages" else 1
+        self._move_to(self.offset + amount * page)
+
+    def _apply_view(self, keep_offset=False):
+        # Recomputes which rows of the data are listed for the selected view.
+        self.indices = None
+        if self.data is not None:
+            total = len(self.data[self.columns[0]])
+            view = self.view.get()
+            if view == VIEW_EVERY_N:
+                try:
+                    step = max(1, int(self.step.get()))
+                except ValueError:
+                    step = 1
+                indices = np.arange(0, total, step)
+                if total and indices[-1] != total - 1:
+                    indices = np.append(indices, total - 1)
+                self.indices = indices
+            elif view == VIEW_SUMMARY:
+                self.indices = self._summary_indices(total)
+        if not keep_offset:
+            self.offset = 0
+        self._render()
+
+    def _summary_indices(self, total):
+        # First and last rows plus the rows holding the minimum and maximum of every value column.
+        if total == 0:
+            return np.array([], dtype=np.int64)
+        indices = {0, total - 1}
+        for column in self.columns[1:]:
+            values = np.asarray(self.data[column], dtype=float).reshape(total, -1)
+            # Systems have one value per component; each component counts on its own.
+            for component in values.T:
+                if np.all(np.isnan(component)):
+                    continue
+                indices.add(int(np.nanargmin(component)))
+                indices.add(int(np.nanargmax(component)))
+        return np.array(sorted(indices), dtype=np.int64)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._move_to(int(float(amount) * self.row_count()))
+        else:
+            self.scroll(int(amount), unit)
+
+    def _on_configure(self, event):
+        # Keeps as many items as fit in the widget after a resize.
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        rows = max(1, event.height // int(row_height) - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._render()
+
+    def _move_to(self, offset):
+        offset = max(0, min(offset, self.row_count() - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _render(self):
+        # Writes the visible window of rows into a fixed pool of Treeview items.
+        total = self.row_count()
+        first = min(self.offset, max(0, total - self.visible_rows))
+        last = min(total, first + self.visible_rows)
+
+        rows = []
+        if last > first:
+            positions = np.arange(first, last) if self.indices is None else self.indices[first:last]
+            columns = [np.asarray(self.data[column])[positions].tolist() for column in self.columns]
+            rows = [format_row(row, self.precision) for row in zip(*columns)]
+            # Vector states are shown as "[y0, y1, ...]" instead of a Tcl list.
+            rows = [tuple(str(value) if isinstance(value, list) else value for value in row) for row in rows]
+
+        items = self.tree.get_children()
+        for item, row in zip(items, rows):
+            self.tree.item(item, values=row)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+        for row in rows[len(items):]:
+            self.tree.insert("", "end", values=row)
+
+        if total:
+            self.scrollbar.set(first / total, last / total)
+            self.count_label.config(text=f"{first + 1}-{last} de {total}")
+        else:
+            self.scrollbar.set(0, 1)
+            self.count_label.config(text="")
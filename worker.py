@@ -0,0 +1,87 @@
+import threading
+import time
+from solvers import SolverCancelled
+
+POLL_INTERVAL = 16  # ms between two polls of a running worker, about 60 per second
+TABLE_INTERVAL = 0.25  # s between two refreshes of the partial results table
+
+
+class SolverWorker(threading.Thread):
+    # Runs one engine call on a background thread. The engine reports through
+    # its progress callback, which is also where a pending cancellation is
+    # turned into a SolverCancelled exception.
+    def __init__(self, target, *args, **kwargs):
+        super().__init__(daemon=True)
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_event = threading.Event()
+
+        self.done = 0
+        self.total = None
+        self.partial = None
+        self.result = None
+        self.error = None
+        # Seconds the window spent showing partial results, see WorkerMonitor.
+        self.display_time = 0.0
+
+    def run(self):
+        try:
+            self.result = self.target(*self.args, progress=self._progress, **self.kwargs)
+        except Exception as e:
+            self.error = e
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def cancelled(self):
+        return isinstance(self.error, SolverCancelled)
+
+    def _progress(self, done, total, partial=None):
+        if self.cancel_event.is_set():
+            raise SolverCancelled("Cálculo cancelado.")
+        self.done = done
+        self.total = total
+        if partial is not None:
+            self.partial = partial
+
+
+class WorkerMonitor:
+    # Starts a worker and follows it from the Tk event loop with after(): the
+    # progress bar is updated on every poll, the partial table a few times per
+    # second and "on_finish" is called once the thread ends. The time taken by
+    # on_partial is added to worker.display_time.
+    def __init__(self, widget, worker, progressbar, on_partial, on_finish):
+        self.widget = widget
+        self.worker = worker
+        self.progressbar = progressbar
+        self.on_partial = on_partial
+        self.on_finish = on_finish
+        self.last_table_update = 0.0
+
+        self.worker.start()
+        self._poll()
+
+    def _poll(self):
+        # The window may have been closed while the solver was running.
+        if not self.widget.winfo_exists():
+            self.worker.cancel()
+            return
+
+        if self.worker.total:
+            self.progressbar.config(mode="determinate", value=100 * self.worker.done / self.worker.total)
+        else:
+            self.progressbar.config(mode="indeterminate")
+            self.progressbar.step(2)
+
+        now = time.monotonic()
+        if self.worker.partial is not None and now - self.last_table_update >= TABLE_INTERVAL:
+            self.last_table_update = now
+            self.on_partial(self.worker.partial)
+            self.worker.display_time += time.monotonic() - now
+
+        if self.worker.is_alive():
+            self.widget.after(POLL_INTERVAL, self._poll)
+        else:
+            self.progressbar.config(mode="determinate", value=0 if self.worker.error else 100)
+            self.on_finish(self.worker)